@@ -8,53 +8,114 @@ This script performs automated code review on GitHub pull requests:
 2. Analyzes code changes
 3. Posts review comments via GitHub API
 
-Usage: python code_review_agent.py
+Usage: python code_review_agent.py [--repo OWNER/NAME] [--pr NUMBER]
 """
 
+import argparse
 import requests
-import json
 import os
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 
+import json_compat
+
+try:
+    import ijson
+except ImportError:
+    # ijson is optional - without it the files list is parsed in one go
+    ijson = None
+
+
+# Shared session so every GitHub API call reuses one pooled keep-alive connection
+SESSION = requests.Session()
+
+
+# All patch checks compiled into one alternation so each patch is scanned once.
+# The group name of every match identifies which check fired. Every keyword is
+# ASCII, so re.ASCII keeps case folding to plain byte-range comparisons.
+REVIEW_PATTERN = re.compile(
+    r"(?P<print>print\()"
+    r"|(?P<todo>TODO|FIXME)"
+    r"|(?P<wildcard>import \*)"
+    r"|(?P<console>console\.log)"
+    r"|(?P<var>var )"
+    r"|(?P<secret>(?i:password|secret|token))",
+    re.ASCII,
+)
+
+
+@dataclass(slots=True)
+class ReviewComments:
+    """Review comments stored column-wise: one list per field, indexed together."""
+    filenames: list = field(default_factory=list)
+    comments: list = field(default_factory=list)
+    file_count: int = 0  # number of distinct files reviewed
+    
+    def add(self, filename, comment):
+        """Append a general (file-level) comment for filename."""
+        self.filenames.append(filename)
+        self.comments.append(comment)
+
 
 def load_env_file():
     """Load environment variables from .env file if it exists."""
     env_file = Path(".env")
     if env_file.exists():
-        with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key.strip()] = value.strip()
+        lines = (line.strip() for line in env_file.read_text().splitlines())
+        pairs = (
+            line.split('=', 1) for line in lines
+            if line and not line.startswith('#') and '=' in line
+        )
+        os.environ.update({key.strip(): value.strip() for key, value in pairs})
+
 
+def ask_user(prompt, default):
+    """Ask a yes/no question, answering with default when stdin is not a TTY."""
+    if not sys.stdin.isatty():
+        print(f"{prompt}{default} (non-interactive)")
+        return default
+    return input(prompt).strip().lower()
 
-def get_user_inputs():
-    """Prompt user for required inputs."""
+
+def get_user_inputs(args):
+    """Resolve repository and PR number from arguments, prompting only for what is missing."""
     print("🤖 Code Review Agent - Setup")
     print("="*50)
     
-    # Get repository info
-    repo_owner = input("📁 Enter repository owner (e.g., terrytaylorbonn): ").strip()
-    if not repo_owner:
-        repo_owner = "terrytaylorbonn"  # Default
-        print(f"   Using default: {repo_owner}")
+    # Only prompt when a person is at the terminal; CI runs use the defaults
+    interactive = sys.stdin.isatty()
     
-    repo_name = input("📁 Enter repository name (e.g., 416bbb_copilot_coding_agent): ").strip()
-    if not repo_name:
-        repo_name = "416bbb_copilot_coding_agent"  # Default
-        print(f"   Using default: {repo_name}")
+    # Get repository info
+    if args.repo:
+        repo_owner, _, repo_name = args.repo.partition('/')
+        print(f"📁 Repository: {repo_owner}/{repo_name}")
+    else:
+        repo_owner = input("📁 Enter repository owner (e.g., terrytaylorbonn): ").strip() if interactive else ""
+        if not repo_owner:
+            repo_owner = "terrytaylorbonn"  # Default
+            print(f"   Using default: {repo_owner}")
+        
+        repo_name = input("📁 Enter repository name (e.g., 416bbb_copilot_coding_agent): ").strip() if interactive else ""
+        if not repo_name:
+            repo_name = "416bbb_copilot_coding_agent"  # Default
+            print(f"   Using default: {repo_name}")
     
     # Get PR number
-    while True:
-        pr_input = input("🔄 Enter Pull Request number (e.g., 8): ").strip()
-        try:
-            pr_number = int(pr_input)
-            break
-        except ValueError:
-            print("❌ Please enter a valid number")
+    pr_number = args.pr
+    if pr_number is not None:
+        print(f"🔄 Pull Request: #{pr_number}")
+    elif interactive:
+        while True:
+            pr_input = input("🔄 Enter Pull Request number (e.g., 8): ").strip()
+            try:
+                pr_number = int(pr_input)
+                break
+            except ValueError:
+                print("❌ Please enter a valid number")
     
     return repo_owner, repo_name, pr_number
 
@@ -71,10 +132,10 @@ def fetch_pr_details(repo_owner, repo_name, pr_number, github_token):
     print(f"\n📥 Fetching PR #{pr_number} details...")
     
     try:
-        response = requests.get(url, headers=headers)
+        response = SESSION.get(url, headers=headers)
         
         if response.status_code == 200:
-            pr_data = response.json()
+            pr_data = json_compat.loads(response.content)
             print(f"✅ Found PR: {pr_data['title']}")
             print(f"📝 Author: {pr_data['user']['login']}")
             print(f"🌿 Branch: {pr_data['head']['ref']} → {pr_data['base']['ref']}")
@@ -103,15 +164,22 @@ def fetch_pr_files(repo_owner, repo_name, pr_number, github_token):
     print(f"📁 Fetching changed files...")
     
     try:
-        response = requests.get(url, headers=headers)
+        response = SESSION.get(url, headers=headers, stream=True)
         
         if response.status_code == 200:
-            files_data = response.json()
-            print(f"✅ Found {len(files_data)} changed files")
+            if ijson:
+                # Parse file entries as they arrive instead of buffering the whole body
+                response.raw.decode_content = True
+                file_iter = ijson.items(response.raw, 'item', use_float=True)
+            else:
+                file_iter = json_compat.loads(response.content)
             
-            for file_data in files_data:
+            files_data = []
+            for file_data in file_iter:
                 print(f"   📄 {file_data['filename']} (+{file_data['additions']} -{file_data['deletions']})")
+                files_data.append(file_data)
             
+            print(f"✅ Found {len(files_data)} changed files")
             return files_data
         else:
             print(f"❌ Failed to fetch files: {response.status_code}")
@@ -122,11 +190,73 @@ def fetch_pr_files(repo_owner, repo_name, pr_number, github_token):
         return None
 
 
+def check_python(patch, hits):
+    """Python-specific checks."""
+    issues = []
+    if 'print' in hits:
+        issues.append("Consider using logging instead of print statements for production code")
+    
+    if 'todo' in hits:
+        issues.append("TODO/FIXME comments found - ensure these are addressed")
+    
+    if 'wildcard' in hits:
+        issues.append("Avoid wildcard imports - use specific imports instead")
+    return issues
+
+
+def check_javascript(patch, hits):
+    """JavaScript/TypeScript checks."""
+    issues = []
+    if 'console' in hits:
+        issues.append("Remove console.log statements before production")
+    
+    if 'var' in hits:
+        issues.append("Consider using 'let' or 'const' instead of 'var'")
+    return issues
+
+
+def check_markdown(patch, hits):
+    """Markdown checks."""
+    issues = []
+    # Count lines in C instead of materialising a list of them
+    if patch.count('\n') + 1 > 50:
+        issues.append("Large documentation change - ensure it's well structured")
+    return issues
+
+
+# File extension -> type-specific checker
+FILE_CHECKS = {
+    '.py': check_python,
+    '.js': check_javascript,
+    '.ts': check_javascript,
+    '.md': check_markdown,
+}
+
+
+def review_patch(filename, patch):
+    """Run the pattern checks for one file's patch and return the issues found."""
+    issues = []
+    
+    # Scan the patch once and collect which checks matched
+    hits = {match.lastgroup for match in REVIEW_PATTERN.finditer(patch)}
+    
+    # Run the checks registered for this file type
+    check = FILE_CHECKS.get(os.path.splitext(filename)[1])
+    if check:
+        issues.extend(check(patch, hits))
+    
+    # Check for potential security issues
+    if 'secret' in hits:
+        issues.append("⚠️ SECURITY: Potential sensitive information detected - ensure no hardcoded secrets")
+    
+    return issues
+
+
 def analyze_code_changes(files_data):
     """Analyze code changes and generate review comments."""
     print(f"\n🔍 Analyzing code changes...")
     
-    review_comments = []
+    review_comments = ReviewComments()
     
     for file_data in files_data:
         filename = file_data['filename']
@@ -135,6 +265,7 @@ def analyze_code_changes(files_data):
         deletions = file_data['deletions']
         
         print(f"   🔍 Reviewing {filename}...")
+        review_comments.file_count += 1
         
         # Basic code review checks
         issues = []
@@ -143,56 +274,24 @@ def analyze_code_changes(files_data):
         if additions > 100:
             issues.append("Large number of additions - consider breaking into smaller changes")
         
-        # Check file types and common issues
-        if filename.endswith('.py'):
-            # Python-specific checks
-            if 'print(' in patch:
-                issues.append("Consider using logging instead of print statements for production code")
-            
-            if 'TODO' in patch or 'FIXME' in patch:
-                issues.append("TODO/FIXME comments found - ensure these are addressed")
-            
-            if 'import *' in patch:
-                issues.append("Avoid wildcard imports - use specific imports instead")
-        
-        elif filename.endswith('.js') or filename.endswith('.ts'):
-            # JavaScript/TypeScript checks
-            if 'console.log' in patch:
-                issues.append("Remove console.log statements before production")
-            
-            if 'var ' in patch:
-                issues.append("Consider using 'let' or 'const' instead of 'var'")
-        
-        elif filename.endswith('.md'):
-            # Markdown checks
-            if len(patch.split('\n')) > 50:
-                issues.append("Large documentation change - ensure it's well structured")
-        
-        # Check for potential security issues
-        if 'password' in patch.lower() or 'secret' in patch.lower() or 'token' in patch.lower():
-            issues.append("⚠️ SECURITY: Potential sensitive information detected - ensure no hardcoded secrets")
+        # GitHub omits the patch for binary and oversized files, and a removed
+        # file's patch is all deletions - neither has added text worth scanning
+        if patch and file_data.get('status') != 'removed':
+            issues.extend(review_patch(filename, patch))
         
         # Add comments for this file
         if issues:
             for issue in issues:
-                review_comments.append({
-                    'filename': filename,
-                    'comment': f"🤖 **Automated Review**: {issue}",
-                    'line': None  # General comment
-                })
+                review_comments.add(filename, f"🤖 **Automated Review**: {issue}")
         else:
-            review_comments.append({
-                'filename': filename,
-                'comment': f"🤖 **Automated Review**: Code looks good! No issues detected.",
-                'line': None
-            })
+            review_comments.add(filename, f"🤖 **Automated Review**: Code looks good! No issues detected.")
     
     return review_comments
 
 
 def post_review_comments(repo_owner, repo_name, pr_number, review_comments, github_token):
     """Post review comments to the GitHub PR."""
-    if not review_comments:
+    if not review_comments.comments:
         print("📝 No review comments to post")
         return True
     
@@ -206,24 +305,30 @@ def post_review_comments(repo_owner, repo_name, pr_number, review_comments, gith
     }
     
     # Prepare review body
-    review_body = f"""## 🤖 Automated Code Review
+    header = f"""## 🤖 Automated Code Review
     
 **Review completed at**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
-**Summary**: Analyzed {len(set(c['filename'] for c in review_comments))} files with automated checks.
+**Summary**: Analyzed {review_comments.file_count} files with automated checks.
 
 ### 📋 Review Comments:
 """
     
-    for comment in review_comments:
-        review_body += f"\n**{comment['filename']}**: {comment['comment']}\n"
-    
-    review_body += """
+    footer = """
 ---
 *This review was automatically generated by the Code Review Agent.*
 *Please review the suggestions and make changes as needed.*
 """
     
+    # Collect the pieces and join once - repeated += copies the body every iteration
+    parts = [header]
+    parts.extend(
+        f"\n**{filename}**: {comment}\n"
+        for filename, comment in zip(review_comments.filenames, review_comments.comments)
+    )
+    parts.append(footer)
+    review_body = ''.join(parts)
+    
     review_data = {
         "body": review_body,
         "event": "COMMENT"  # APPROVE, REQUEST_CHANGES, or COMMENT
@@ -232,10 +337,10 @@ def post_review_comments(repo_owner, repo_name, pr_number, review_comments, gith
     print(f"\n📝 Posting automated review...")
     
     try:
-        response = requests.post(url, headers=headers, json=review_data)
+        response = SESSION.post(url, headers=headers, data=json_compat.dumps(review_data))
         
         if response.status_code == 200:
-            review = response.json()
+            review = json_compat.loads(response.content)
             print(f"✅ Review posted successfully!")
             print(f"🔗 Review URL: {review['html_url']}")
             return True
@@ -255,6 +360,35 @@ def main():
     # Load environment variables
     load_env_file()
     
+    parser = argparse.ArgumentParser(
+        description="Automated code review for a GitHub pull request",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python code_review_agent.py                                  # Prompt for everything
+  python code_review_agent.py --repo owner/name --pr 8         # Non-interactive
+  GITHUB_REPOSITORY=owner/name PR_NUMBER=8 python code_review_agent.py
+        """
+    )
+    
+    parser.add_argument(
+        "--repo",
+        default=os.getenv('GITHUB_REPOSITORY'),
+        help="Repository as OWNER/NAME (default: $GITHUB_REPOSITORY)"
+    )
+    
+    parser.add_argument(
+        "--pr",
+        type=int,
+        default=os.getenv('PR_NUMBER'),
+        help="Pull request number to review (default: $PR_NUMBER)"
+    )
+    
+    args = parser.parse_args()
+    
+    if args.repo and '/' not in args.repo:
+        parser.error("--repo must be in OWNER/NAME form")
+    
     # Get GitHub token
     github_token = os.getenv('GITHUB_TOKEN')
     
@@ -267,10 +401,19 @@ def main():
     print("="*60)
     
     # Get user inputs
-    repo_owner, repo_name, pr_number = get_user_inputs()
+    repo_owner, repo_name, pr_number = get_user_inputs(args)
+    if pr_number is None:
+        print("❌ Error: No pull request number given!")
+        print("Pass --pr or set the PR_NUMBER environment variable")
+        return 1
+    
+    # Fetch PR details and changed files concurrently - both calls are network-bound
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        details_future = executor.submit(fetch_pr_details, repo_owner, repo_name, pr_number, github_token)
+        files_future = executor.submit(fetch_pr_files, repo_owner, repo_name, pr_number, github_token)
+        pr_data = details_future.result()
+        files_data = files_future.result()
     
-    # Fetch PR details
-    pr_data = fetch_pr_details(repo_owner, repo_name, pr_number, github_token)
     if not pr_data:
         print("❌ Cannot proceed without PR data")
         return 1
@@ -278,13 +421,11 @@ def main():
     # Check if PR is in reviewable state
     if pr_data['state'] != 'open':
         print(f"⚠️ Warning: PR is {pr_data['state']}, not open")
-        proceed = input("Continue anyway? (y/N): ").strip().lower()
+        proceed = ask_user("Continue anyway? (y/N): ", default='n')
         if proceed != 'y':
             print("👋 Review cancelled")
             return 0
     
-    # Fetch changed files
-    files_data = fetch_pr_files(repo_owner, repo_name, pr_number, github_token)
     if not files_data:
         print("❌ Cannot proceed without file data")
         return 1
@@ -294,12 +435,12 @@ def main():
     
     # Show preview of comments
     print(f"\n📋 Review Summary:")
-    print(f"   Files analyzed: {len(set(c['filename'] for c in review_comments))}")
-    print(f"   Comments generated: {len(review_comments)}")
+    print(f"   Files analyzed: {review_comments.file_count}")
+    print(f"   Comments generated: {len(review_comments.comments)}")
     
     # Ask for confirmation
     print(f"\n🤔 Ready to post automated review to PR #{pr_number}?")
-    confirm = input("Post review? (Y/n): ").strip().lower()
+    confirm = ask_user("Post review? (Y/n): ", default='y')
     
     if confirm in ['', 'y', 'yes']:
         # Post review comments
@@ -5,7 +5,7 @@ Code Review Agent Setup - REAL Actions Only
 
 This script sets up what you need to test the code_review_agent.py:
 1. Creates a GitHub issue requesting a code review test
-2. Creates a branch with sample code that has review issues
+2. Creates a branch with sample code that has review issues (via the GitHub API, no clone)
 3. Creates a pull request for the code review agent to analyze
 
 Usage: python code_review_agent_setup.py
@@ -14,14 +14,144 @@ Usage: python code_review_agent_setup.py
 import requests
 import json
 import os
-import subprocess
-import tempfile
+import socket
+import string
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
 
-def load_env_file():
-    """Load environment variables from .env file if it exists."""
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled sockets keep urllib3's TCP_NODELAY and add SO_KEEPALIVE."""
+
+    socket_options = HTTPConnection.default_socket_options + [
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self.socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+    def proxy_manager_for(self, *args, **kwargs):
+        kwargs["socket_options"] = self.socket_options
+        return super().proxy_manager_for(*args, **kwargs)
+
+
+# Shared session so every GitHub API call reuses one pooled keep-alive connection
+SESSION = requests.Session()
+SESSION.mount("https://", KeepAliveAdapter(pool_connections=4, pool_maxsize=16))
+
+
+# Fixed file and PR bodies live at module level so they're built once, not per call
+TEST_CODE_PY = '''#!/usr/bin/env python3
+"""
+Test Code - Created for Code Review Agent Testing
+
+This file intentionally contains issues that should be caught by code review.
+"""
+
+from datetime import datetime
+import os
+from pathlib import *  # Wildcard import - should be flagged
+
+def main():
+    """Main function with review issues."""
+    # TODO: This function needs refactoring
+    print("Starting test code execution...")  # Should suggest logging
+    print(f"Current time: {datetime.now()}")  # Another print statement
+    
+    # FIXME: Handle error cases properly
+    password = "secret123"  # Should flag security issue
+    api_token = "abc123xyz"  # Should flag security issue
+    
+    print("Test completed!")  # Another print statement
+    
+    # TODO: Add proper error handling
+    return 0
+
+if __name__ == "__main__":
+    main()
+'''
+
+SAMPLE_SCRIPT_JS = '''// Sample JavaScript - Created for Code Review Agent Testing
+// This file intentionally contains issues for review testing
+
+var globalVar = "should use let or const";  // Should flag var usage
+var anotherVar = "more var usage";
+
+function testFunction() {
+    console.log("Debug message 1");  // Should flag console.log
+    console.log("Debug message 2");  // Another console.log
+    
+    var localVar = "local variable";  // More var usage
+    console.log("Local var:", localVar);  // More console.log
+    
+    return "test complete";
+}
+
+// Call the function
+testFunction();
+console.log("Script finished");  // Final console.log
+'''
+
+# 60 sections so the file is well past the reviewer's large-file threshold
+TEST_DOCS_MD = (
+    "# Large Test Documentation\n\n"
+    "## Overview\n\n"
+    "This is a large documentation file created for testing code review.\n\n"
+    + "".join(
+        f"### Section {i}\n\n"
+        f"This is section {i} with some content about testing.\n\n"
+        f"More details for section {i}.\n\n"
+        for i in range(1, 61)
+    )
+)
+
+PR_BODY_TEMPLATE = string.Template("""## 🤖 Code Review Agent Test
+
+This pull request was created to test the automated code review agent functionality.
+
+### What's included:
+- ✅ `test_code.py` - Python with intentional review issues
+- ✅ `sample_script.js` - JavaScript with review issues  
+- ✅ `test_docs.md` - Large documentation file
+- ✅ `test_config.json` - Test configuration
+
+### Expected Review Issues:
+1. **Python Issues**:
+   - Print statements (should suggest logging)
+   - TODO/FIXME comments
+   - Wildcard imports
+   - Hardcoded secrets
+
+2. **JavaScript Issues**:
+   - console.log statements
+   - var usage (should suggest let/const)
+
+3. **Documentation Issues**:
+   - Large file size
+
+### Related Issue
+Closes #$issue_number
+
+### Testing Instructions:
+1. Run `python code_review_agent.py`
+2. Enter this PR number when prompted
+3. Review the automated comments generated
+
+---
+*This PR was automatically generated by code_review_agent_setup.py*
+""")
+
+
+@lru_cache(maxsize=1)
+def _parsed_env():
+    """Parse the .env file once and return its key/value pairs."""
+    env_vars = {}
     env_file = Path(".env")
     if env_file.exists():
         with open(env_file, 'r') as f:
@@ -29,7 +159,13 @@ def load_env_file():
                 line = line.strip()
                 if line and not line.startswith('#') and '=' in line:
                     key, value = line.split('=', 1)
-                    os.environ[key.strip()] = value.strip()
+                    env_vars[key.strip()] = value.strip()
+    return env_vars
+
+
+def load_env_file():
+    """Load environment variables from .env file if it exists."""
+    os.environ.update(_parsed_env())
 
 
 def get_user_inputs():
@@ -94,7 +230,7 @@ Test the automated code review functionality by creating code that will trigger
     print(f"📝 Title: {title}")
     
     try:
-        response = requests.post(url, headers=headers, json=issue_data)
+        response = SESSION.post(url, headers=headers, json=issue_data)
         
         if response.status_code == 201:
             issue = response.json()
@@ -111,113 +247,122 @@ Test the automated code review functionality by creating code that will trigger
         return None
 
 
-def create_test_files_and_branch(repo_owner, repo_name, github_token, issue_number):
-    """Create branch with test files that have review issues."""
+def create_blob_on_github(repo_owner, repo_name, github_token, content):
+    """Upload file content as a Git blob and return its sha."""
+    url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/git/blobs"
     
-    repo_url = f"https://{github_token}@github.com/{repo_owner}/{repo_name}.git"
-    temp_dir = Path(tempfile.mkdtemp())
-    repo_path = temp_dir / repo_name
+    headers = {
+        "Authorization": f"token {github_token}",
+        "Accept": "application/vnd.github.v3+json",
+        "Content-Type": "application/json"
+    }
     
-    print(f"\n🔄 Creating test files with intentional review issues...")
+    # Text files go up as-is; base64 would inflate the body by a third
+    blob_data = {
+        "content": content,
+        "encoding": "utf-8"
+    }
     
-    try:
-        # Clone the repository
-        print(f"📥 Cloning repository to {repo_path}...")
-        result = subprocess.run(
-            ["git", "clone", repo_url, str(repo_path)],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        print("✅ Repository cloned successfully!")
-        
-        # Change to repo directory
-        original_cwd = os.getcwd()
-        os.chdir(repo_path)
-        
-        # Create branch
-        branch_name = f"code-review-test-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
-        subprocess.run(["git", "checkout", "-b", branch_name], check=True, capture_output=True)
-        print(f"✅ Created branch: {branch_name}")
-        
-        # Create test_code.py with review issues
-        test_code_content = f'''#!/usr/bin/env python3
-"""
-Test Code - Created for Code Review Agent Testing
-
-This file intentionally contains issues that should be caught by code review.
-"""
+    response = SESSION.post(url, headers=headers, json=blob_data)
+    if response.status_code != 201:
+        print(f"❌ Failed to create blob: {response.status_code}")
+        print(f"Response: {response.text}")
+        return None
+    
+    return response.json()['sha']
 
-from datetime import datetime
-import os
-from pathlib import *  # Wildcard import - should be flagged
 
-def main():
-    """Main function with review issues."""
-    # TODO: This function needs refactoring
-    print("Starting test code execution...")  # Should suggest logging
-    print(f"Current time: {{datetime.now()}}")  # Another print statement
+def commit_files_to_new_branch(repo_owner, repo_name, github_token, branch_name, files, message, base="main"):
+    """Commit files as one commit on top of base and point a new branch at it."""
+    api_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}"
     
-    # FIXME: Handle error cases properly
-    password = "secret123"  # Should flag security issue
-    api_token = "abc123xyz"  # Should flag security issue
+    headers = {
+        "Authorization": f"token {github_token}",
+        "Accept": "application/vnd.github.v3+json",
+        "Content-Type": "application/json"
+    }
     
-    print("Test completed!")  # Another print statement
+    response = SESSION.get(f"{api_url}/commits/{base}", headers=headers)
+    if response.status_code != 200:
+        print(f"❌ Failed to look up branch {base}: {response.status_code}")
+        return False
+    base_commit = response.json()
+    
+    # Blobs are independent uploads, so send them concurrently. Contents API PUTs
+    # can't be: each one commits and moves the branch ref, so parallel PUTs race (409)
+    with ThreadPoolExecutor(max_workers=len(files)) as executor:
+        futures = {
+            executor.submit(create_blob_on_github, repo_owner, repo_name, github_token, content): path
+            for path, content in files.items()
+        }
+        blob_shas = {}
+        for future in as_completed(futures):
+            sha = future.result()
+            if sha is None:
+                for pending in futures:
+                    pending.cancel()
+                return False
+            blob_shas[futures[future]] = sha
+            print(f"✅ Uploaded {futures[future]}")
+    
+    tree_data = {
+        "base_tree": base_commit['commit']['tree']['sha'],
+        "tree": [
+            {"path": path, "mode": "100644", "type": "blob", "sha": sha}
+            for path, sha in blob_shas.items()
+        ]
+    }
+    response = SESSION.post(f"{api_url}/git/trees", headers=headers, json=tree_data)
+    if response.status_code != 201:
+        print(f"❌ Failed to create tree: {response.status_code}")
+        print(f"Response: {response.text}")
+        return False
+    tree_sha = response.json()['sha']
+    
+    commit_data = {
+        "message": message,
+        "tree": tree_sha,
+        "parents": [base_commit['sha']]
+    }
+    response = SESSION.post(f"{api_url}/git/commits", headers=headers, json=commit_data)
+    if response.status_code != 201:
+        print(f"❌ Failed to create commit: {response.status_code}")
+        print(f"Response: {response.text}")
+        return False
+    commit_sha = response.json()['sha']
+    print("✅ Created git commit")
+    
+    ref_data = {
+        "ref": f"refs/heads/{branch_name}",
+        "sha": commit_sha
+    }
+    response = SESSION.post(f"{api_url}/git/refs", headers=headers, json=ref_data)
+    if response.status_code != 201:
+        print(f"❌ Failed to create branch: {response.status_code}")
+        print(f"Response: {response.text}")
+        return False
     
-    # TODO: Add proper error handling
-    return 0
-
-if __name__ == "__main__":
-    main()
-'''
-        
-        with open("test_code.py", "w", encoding="utf-8") as f:
-            f.write(test_code_content)
-        print("✅ Created test_code.py (with review issues)")
-        
-        # Create sample_script.js with review issues
-        js_content = f'''// Sample JavaScript - Created for Code Review Agent Testing
-// This file intentionally contains issues for review testing
+    return True
 
-var globalVar = "should use let or const";  // Should flag var usage
-var anotherVar = "more var usage";
 
-function testFunction() {{
-    console.log("Debug message 1");  // Should flag console.log
-    console.log("Debug message 2");  // Another console.log
+def create_test_files_and_branch(repo_owner, repo_name, github_token, issue_number):
+    """Create branch with test files that have review issues."""
     
-    var localVar = "local variable";  // More var usage
-    console.log("Local var:", localVar);  // More console.log
+    print(f"\n🔄 Creating test files with intentional review issues...")
     
-    return "test complete";
-}}
-
-// Call the function
-testFunction();
-console.log("Script finished");  // Final console.log
-'''
-        
-        with open("sample_script.js", "w", encoding="utf-8") as f:
-            f.write(js_content)
-        print("✅ Created sample_script.js (with review issues)")
+    try:
+        branch_name = f"code-review-test-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
         
-        # Create large test_docs.md
-        large_doc_lines = []
-        large_doc_lines.append("# Large Test Documentation\\n")
-        large_doc_lines.append("## Overview\\n")
-        large_doc_lines.append("This is a large documentation file created for testing code review.\\n")
+        test_files = {}
         
-        for i in range(60):  # Create 60+ lines to trigger large file warning
-            large_doc_lines.append(f"### Section {i+1}\\n")
-            large_doc_lines.append(f"This is section {i+1} with some content about testing.\\n")
-            large_doc_lines.append(f"More details for section {i+1}.\\n")
-            large_doc_lines.append("\\n")
+        # Create test_code.py with review issues
+        test_files["test_code.py"] = TEST_CODE_PY
         
-        large_doc_content = "\\n".join(large_doc_lines)
+        # Create sample_script.js with review issues
+        test_files["sample_script.js"] = SAMPLE_SCRIPT_JS
         
-        with open("test_docs.md", "w", encoding="utf-8") as f:
-            f.write(large_doc_content)
-        print("✅ Created test_docs.md (large documentation file)")
+        # Create large test_docs.md
+        test_files["test_docs.md"] = TEST_DOCS_MD
         
         # Create test config with review info
         test_config = {
@@ -237,22 +382,14 @@ console.log("Script finished");  // Final console.log
             ]
         }
         
-        with open("test_config.json", "w", encoding="utf-8") as f:
-            json.dump(test_config, f, indent=2)
-        print("✅ Created test_config.json")
+        test_files["test_config.json"] = json.dumps(test_config, indent=2)
         
-        # Add files to git
-        subprocess.run(["git", "add", "."], check=True, capture_output=True)
-        print("✅ Added files to git")
-        
-        # Commit files
+        # One commit for all files, created directly on GitHub - no local clone is needed
         commit_message = f"🧪 Add test files for code review agent - Issue #{issue_number}"
-        subprocess.run(["git", "commit", "-m", commit_message], check=True, capture_output=True)
-        print("✅ Created git commit")
-        
-        # Push to GitHub
-        subprocess.run(["git", "push", "-u", "origin", branch_name], check=True, capture_output=True)
-        print("✅ Pushed branch to GitHub")
+        if not commit_files_to_new_branch(repo_owner, repo_name, github_token, branch_name,
+                                          test_files, commit_message):
+            return None
+        print(f"✅ Created branch: {branch_name}")
         
         print(f"\\n🎉 Test files created successfully!")
         print(f"🌿 Branch: {branch_name}")
@@ -260,14 +397,9 @@ console.log("Script finished");  // Final console.log
         
         return branch_name
         
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Git command failed: {e}")
-        return None
     except Exception as e:
         print(f"❌ Error creating files: {e}")
         return None
-    finally:
-        os.chdir(original_cwd)
 
 
 def create_pull_request(repo_owner, repo_name, github_token, branch_name, issue_number):
@@ -282,41 +414,7 @@ def create_pull_request(repo_owner, repo_name, github_token, branch_name, issue_
     }
     
     pr_title = f"🧪 Code Review Test Files - Issue #{issue_number}"
-    pr_body = f"""## 🤖 Code Review Agent Test
-
-This pull request was created to test the automated code review agent functionality.
-
-### What's included:
-- ✅ `test_code.py` - Python with intentional review issues
-- ✅ `sample_script.js` - JavaScript with review issues  
-- ✅ `test_docs.md` - Large documentation file
-- ✅ `test_config.json` - Test configuration
-
-### Expected Review Issues:
-1. **Python Issues**:
-   - Print statements (should suggest logging)
-   - TODO/FIXME comments
-   - Wildcard imports
-   - Hardcoded secrets
-
-2. **JavaScript Issues**:
-   - console.log statements
-   - var usage (should suggest let/const)
-
-3. **Documentation Issues**:
-   - Large file size
-
-### Related Issue
-Closes #{issue_number}
-
-### Testing Instructions:
-1. Run `python code_review_agent.py`
-2. Enter this PR number when prompted
-3. Review the automated comments generated
-
----
-*This PR was automatically generated by code_review_agent_setup.py*
-"""
+    pr_body = PR_BODY_TEMPLATE.substitute(issue_number=issue_number)
     
     pr_data = {
         "title": pr_title,
@@ -332,7 +430,7 @@ Closes #{issue_number}
     print(f"🎯 To branch: main")
     
     try:
-        response = requests.post(url, headers=headers, json=pr_data)
+        response = SESSION.post(url, headers=headers, json=pr_data)
         
         if response.status_code == 201:
             pr = response.json()
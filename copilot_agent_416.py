@@ -14,17 +14,26 @@ Unlike the demo/simulation, this creates real:
 The script includes pauses so you can check results in GitHub after each step.
 """
 
+import io
 import os
-import json
+import shutil
+import stat
 import time
 import subprocess
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Any
+from dataclasses import dataclass, asdict, field, replace
 from pathlib import Path
+from urllib.parse import urlsplit
 import argparse
 
+import json_compat
+
 
 @dataclass
 class Issue:
@@ -34,7 +43,7 @@ class Issue:
     description: str
     labels: List[str]
     assignee: str
-    created_at: str
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
     status: str = "open"
 
 
@@ -73,293 +82,50 @@ class PullRequest:
     branch_name: str
 
 
-class RealCopilotAgent:
-    """
-    Real GitHub Copilot coding agent that works with actual repositories.
-    
-    This class performs actual operations on a real GitHub repository:
-    - Clones and analyzes real code
-    - Creates real git commits
-    - Creates real GitHub pull requests (with API token)
-    - Makes real code changes
-    """
-    
-    def __init__(self, repo_url: str, github_token: Optional[str] = None):
-        self.repo_url = repo_url
-        self.github_token = github_token
-        self.repo_name = repo_url.split('/')[-1].replace('.git', '')
-        self.repo_owner = repo_url.split('/')[-2]
-        self.agent_id = "copilot-agent-real"
-        self.current_issue: Optional[Issue] = None
-        self.current_pr: Optional[PullRequest] = None
-        self.logs: List[str] = []
-        self.analysis_results: Dict[str, Any] = {}
-        self.repo_path = Path(f"./{self.repo_name}")
-        self.branch_name = f"copilot-fix-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
-    
-    def log(self, message: str, level: str = "INFO") -> None:
-        """Add a log entry with timestamp."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] [{level}] {message}"
-        self.logs.append(log_entry)
-        print(f"🤖 {log_entry}")
-    
-    def pause_for_verification(self, step_name: str, instructions: str) -> None:
-        """Pause execution so user can verify results in GitHub."""
-        print("\n" + "="*60)
-        print(f"⏸️  PAUSE: {step_name}")
-        print("="*60)
-        print(f"📋 {instructions}")
-        print("\n🔗 Check your repository at:")
-        print(f"   https://github.com/{self.repo_owner}/{self.repo_name}")
-        print("\n⌨️  Press Enter to continue to next step...")
-        print("="*60)
-        input()
-    
-    def react_to_issue(self, issue: Issue) -> None:
-        """Step 1: React to issue assignment with 👀 emoji."""
-        self.current_issue = issue
-        self.log(f"👀 Processing real issue: {issue.title}")
-        self.log("Starting real GitHub Copilot agent workflow...")
-        
-        self.pause_for_verification(
-            "Issue Recognition",
-            f"The agent has recognized issue: '{issue.title}'\n"
-            f"In a real scenario, you would see a 👀 reaction on the GitHub issue."
-        )
-    
-    def clone_and_analyze_repo(self) -> Dict[str, Any]:
-        """Step 2: Clone the actual repository and perform real analysis."""
-        self.log(f"📥 Cloning actual repository: {self.repo_url}")
-        
-        # Remove existing directory if it exists
-        if self.repo_path.exists():
-            self.log("Removing existing repository directory...")
-            subprocess.run(["rmdir", "/s", "/q", str(self.repo_path)], shell=True, capture_output=True)
-        
-        # Clone the repository
-        try:
-            result = subprocess.run(
-                ["git", "clone", self.repo_url, str(self.repo_path)],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            self.log("✅ Repository cloned successfully")
-        except subprocess.CalledProcessError as e:
-            self.log(f"❌ Failed to clone repository: {e.stderr}", "ERROR")
-            raise
-        
-        self.log("🔍 Analyzing actual codebase structure...")
-        
-        # Perform real analysis of the repository
-        analysis = self._analyze_real_codebase()
-        self.analysis_results = analysis
-        
-        self.log(f"✅ Real analysis complete: {analysis['file_count']} files, {analysis['line_count']:,} lines")
-        self.log(f"📊 Languages found: {', '.join(analysis['languages'])}")
-        
-        self.pause_for_verification(
-            "Repository Analysis",
-            f"Repository has been cloned and analyzed.\n"
-            f"Found {analysis['file_count']} files with {analysis['line_count']} lines of code.\n"
-            f"Languages: {', '.join(analysis['languages'])}\n"
-            f"Check the cloned repository in your local directory: {self.repo_path}"
-        )
-        
-        return analysis
-    
-    def _analyze_real_codebase(self) -> Dict[str, Any]:
-        """Perform actual analysis of the cloned repository."""
-        file_count = 0
-        line_count = 0
-        languages = set()
-        
-        language_extensions = {
-            '.py': 'Python',
-            '.js': 'JavaScript', 
-            '.ts': 'TypeScript',
-            '.html': 'HTML',
-            '.css': 'CSS',
-            '.md': 'Markdown',
-            '.json': 'JSON',
-            '.yml': 'YAML',
-            '.yaml': 'YAML',
-            '.txt': 'Text'
-        }
-        
-        for file_path in self.repo_path.rglob('*'):
-            if file_path.is_file() and not str(file_path).startswith('.git'):
-                file_count += 1
-                
-                # Count lines
-                try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        file_lines = sum(1 for _ in f)
-                        line_count += file_lines
-                except:
-                    pass
-                
-                # Detect language
-                ext = file_path.suffix.lower()
-                if ext in language_extensions:
-                    languages.add(language_extensions[ext])
-        
-        return {
-            "file_count": file_count,
-            "line_count": line_count,
-            "languages": list(languages),
-            "repository_size": self._get_directory_size(self.repo_path)
-        }
-    
-    def _get_directory_size(self, path: Path) -> str:
-        """Get human-readable directory size."""
-        total_size = 0
-        for file_path in path.rglob('*'):
-            if file_path.is_file():
-                try:
-                    total_size += file_path.stat().st_size
-                except:
-                    pass
-        
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if total_size < 1024.0:
-                return f"{total_size:.1f} {unit}"
-            total_size /= 1024.0
-        return f"{total_size:.1f} TB"
-    
-    def create_implementation_plan(self) -> List[Dict[str, str]]:
-        """Step 3: Create detailed implementation plan based on issue and real analysis."""
-        self.log("📋 Creating implementation plan based on real repository...")
-        
-        issue_keywords = self.current_issue.description.lower()
-        
-        plan = []
-        
-        # Check what actually exists in the repository
-        readme_exists = (self.repo_path / "README.md").exists()
-        
-        if "readme" in issue_keywords or "documentation" in issue_keywords or not readme_exists:
-            plan.append({
-                "step": "Create/Update README",
-                "file": "README.md",
-                "description": "Add comprehensive project documentation",
-                "reasoning": "Good documentation is essential for any project"
-            })
-        
-        if "example" in issue_keywords or "demo" in issue_keywords:
-            plan.append({
-                "step": "Create example script",
-                "file": "example_usage.py",
-                "description": "Add example showing how to use the project",
-                "reasoning": "Examples help users understand the project"
-            })
-        
-        if "test" in issue_keywords or "testing" in issue_keywords:
-            plan.append({
-                "step": "Add test file",
-                "file": "test_basic.py", 
-                "description": "Add basic unit tests",
-                "reasoning": "Tests ensure code quality and reliability"
-            })
-        
-        if "config" in issue_keywords or "configuration" in issue_keywords:
-            plan.append({
-                "step": "Add configuration",
-                "file": "config.json",
-                "description": "Add project configuration file",
-                "reasoning": "Configuration files make projects more flexible"
-            })
-        
-        # Default plan if no specific keywords found
-        if not plan:
-            plan = [
-                {
-                    "step": "Update README",
-                    "file": "README.md",
-                    "description": "Improve project documentation",
-                    "reasoning": "Based on issue requirements"
-                },
-                {
-                    "step": "Add example",
-                    "file": "example.py",
-                    "description": "Add practical example",
-                    "reasoning": "Enhance project usability"
-                }
-            ]
-        
-        for i, step in enumerate(plan, 1):
-            self.log(f"📌 Step {i}: {step['step']} - {step['description']}")
-        
-        self.pause_for_verification(
-            "Implementation Plan Created",
-            f"Created implementation plan with {len(plan)} steps:\n" +
-            "\n".join(f"  {i+1}. {step['step']}: {step['description']}" for i, step in enumerate(plan))
-        )
-        
-        return plan
-    
-    def generate_real_code_changes(self, plan: List[Dict[str, str]]) -> List[CodeChange]:
-        """Step 4: Generate actual code changes and write real files."""
-        self.log("⚙️ Generating real code changes...")
-        changes = []
-        
-        for step in plan:
-            self.log(f"🔧 Working on: {step['step']}")
-            
-            file_path = self.repo_path / step['file']
-            
-            # Generate actual content based on the file type
-            if step['file'] == "README.md":
-                content = self._generate_readme_content()
-            elif step['file'].endswith('.py'):
-                content = self._generate_python_content(step['file'])
-            elif step['file'].endswith('.json'):
-                content = self._generate_json_content()
-            else:
-                content = f"# {step['description']}\n\nThis file was created by Copilot Agent.\n"
-            
-            # Write the actual file
-            lines_before = 0
-            if file_path.exists():
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        lines_before = sum(1 for _ in f)
-                except:
-                    lines_before = 0
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            lines_after = len(content.split('\n'))
-            lines_added = lines_after - lines_before if lines_before > 0 else lines_after
-            lines_removed = max(0, lines_before - lines_after) if lines_before > 0 else 0
-            
-            change = CodeChange(
-                file_path=step['file'],
-                change_type="create" if lines_before == 0 else "modify",
-                description=step['description'],
-                lines_added=max(0, lines_added),
-                lines_removed=lines_removed,
-                reasoning=step['reasoning'],
-                actual_content=content[:200] + "..." if len(content) > 200 else content
-            )
-            
-            changes.append(change)
-            self.log(f"✅ Created: {step['file']} (+{change.lines_added} lines)")
-        
-        self.pause_for_verification(
-            "Code Changes Generated",
-            f"Generated {len(changes)} real file changes.\n"
-            f"Check the files in your local repository: {self.repo_path}\n"
-            f"Files created/modified: {', '.join(c.file_path for c in changes)}"
-        )
-        
-        return changes
-    
-    def _generate_readme_content(self) -> str:
-        """Generate comprehensive README content."""
-        return f"""# {self.repo_name}
+def parse_repo_url(repo_url: str) -> tuple:
+    """Split an HTTPS or scp-style SSH clone URL into (owner, name)."""
+    parts = urlsplit(repo_url)
+    # git@github.com:owner/repo.git has no scheme; the path follows the colon
+    path = parts.path if parts.scheme else repo_url.partition(':')[2]
+    owner, name = path.strip('/').split('/')[-2:]
+    return owner, name.removesuffix('.git')
+
+
+def _remove_readonly(func, path, exc_info):
+    """rmtree error handler: clear the read-only bit git sets on objects, then retry."""
+    os.chmod(path, stat.S_IWRITE)
+    func(path)
+
+
+# File extension (lower-case, with dot) -> language name
+LANGUAGE_EXTENSIONS = {
+    '.py': 'Python',
+    '.js': 'JavaScript',
+    '.ts': 'TypeScript',
+    '.html': 'HTML',
+    '.css': 'CSS',
+    '.md': 'Markdown',
+    '.json': 'JSON',
+    '.yml': 'YAML',
+    '.yaml': 'YAML',
+    '.txt': 'Text'
+}
+
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+# Directories never worth analyzing: VCS metadata, dependencies and caches
+SKIP_DIRS = frozenset({'.git', 'node_modules', '.venv', 'venv', '__pycache__', '.mypy_cache', '.pytest_cache'})
+
+# Line counts keyed by git blob sha and whole analyses keyed by git tree sha,
+# kept outside the clone so they survive re-clones
+ANALYSIS_MANIFEST = Path(".copilot-agent") / "manifest.json"
+ANALYSIS_MANIFEST_VERSION = 1
+ANALYSIS_CACHE_SIZE = 16
+
+
+# Generated file bodies. Only the README and the generic module template have
+# per-run fields, filled in with str.format_map.
+README_TEMPLATE = """# {repo_name}
 
 ## 🤖 Copilot Coding Agent Test Repository
 
@@ -393,10 +159,10 @@ This is a test repository for demonstrating how GitHub Copilot coding agents wor
 
 ```bash
 # Clone the repository
-git clone https://github.com/{self.repo_owner}/{self.repo_name}.git
+git clone https://github.com/{repo_owner}/{repo_name}.git
 
 # Navigate to directory
-cd {self.repo_name}
+cd {repo_name}
 
 # Run example (if available)
 python example.py
@@ -404,7 +170,7 @@ python example.py
 
 ### Generated by Copilot Agent
 
-This README was automatically generated by a GitHub Copilot coding agent on {datetime.now().strftime('%Y-%m-%d at %H:%M:%S')}.
+This README was automatically generated by a GitHub Copilot coding agent on {generated_at}.
 
 ### Contributing
 
@@ -417,11 +183,8 @@ This is a test repository. Feel free to:
 
 🤖 **Powered by GitHub Copilot Agents**
 """
-    
-    def _generate_python_content(self, filename: str) -> str:
-        """Generate Python file content based on filename."""
-        if "example" in filename.lower():
-            return '''#!/usr/bin/env python3
+
+EXAMPLE_PY = '''#!/usr/bin/env python3
 """
 Example Usage - Copilot Agent Demo
 
@@ -494,8 +257,8 @@ def main():
 if __name__ == "__main__":
     main()
 '''
-        elif "test" in filename.lower():
-            return '''#!/usr/bin/env python3
+
+TEST_PY = '''#!/usr/bin/env python3
 """
 Basic Unit Tests
 
@@ -565,13 +328,13 @@ if __name__ == "__main__":
     print("🧪 Running Copilot Agent Tests...")
     unittest.main(verbosity=2)
 '''
-        else:
-            return f'''#!/usr/bin/env python3
+
+PY_MODULE_TEMPLATE = '''#!/usr/bin/env python3
 """
 {filename} - Generated by Copilot Agent
 
 This file was automatically created by GitHub Copilot Agent
-on {datetime.now().strftime('%Y-%m-%d at %H:%M:%S')}.
+on {generated_at}.
 """
 
 def main():
@@ -582,16 +345,498 @@ def main():
 if __name__ == "__main__":
     main()
 '''
+
+
+class RealCopilotAgent:
+    """
+    Real GitHub Copilot coding agent that works with actual repositories.
     
-    def _generate_json_content(self) -> str:
-        """Generate JSON configuration content."""
-        config = {
-            "project_name": self.repo_name,
-            "copilot_agent": {
-                "version": "1.0",
-                "created_at": datetime.now().isoformat(),
-                "capabilities": [
-                    "code_generation",
+    This class performs actual operations on a real GitHub repository:
+    - Clones and analyzes real code
+    - Creates real git commits
+    - Creates real GitHub pull requests (with API token)
+    - Makes real code changes
+    """
+    
+    def __init__(self, repo_url: str, github_token: Optional[str] = None):
+        self.repo_url = repo_url
+        self.github_token = github_token
+        self.repo_owner, self.repo_name = parse_repo_url(repo_url)
+        self.agent_id = "copilot-agent-real"
+        self.current_issue: Optional[Issue] = None
+        self.current_pr: Optional[PullRequest] = None
+        self.logs: List[str] = []
+        self.analysis_results: Dict[str, Any] = {}
+        manifest = self._load_manifest()
+        self.line_count_manifest: Dict[str, int] = manifest.get("line_counts", {})
+        self.analysis_cache: Dict[str, Dict[str, Any]] = manifest.get("analyses", {})
+        self._repository_size: Optional[str] = None
+        self.repo_path = Path(f"./{self.repo_name}")
+        self.branch_name = f"copilot-fix-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        self._gh = self._create_github_session()
+    
+    def _create_github_session(self) -> requests.Session:
+        """Create a pooled GitHub API session that backs off on rate limiting."""
+        # Only connect failures and statuses where GitHub did not act on the request
+        # are retried; read errors are not, since the POST may already have created the PR
+        retry = Retry(
+            total=5,
+            read=False,
+            backoff_factor=0.5,
+            status_forcelist=(429, 503),
+            allowed_methods=None,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retry))
+        session.headers.update({"Accept": "application/vnd.github.v3+json"})
+        if self.github_token:
+            session.headers["Authorization"] = f"token {self.github_token}"
+        return session
+    
+    def log(self, message: str, level: str = "INFO") -> None:
+        """Add a log entry with timestamp."""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        log_entry = f"[{timestamp}] [{level}] {message}"
+        self.logs.append(log_entry)
+        print(f"🤖 {log_entry}")
+    
+    def pause_for_verification(self, step_name: str, instructions: str) -> None:
+        """Pause execution so user can verify results in GitHub."""
+        # Build the banner once and write it in a single call
+        print("\n".join([
+            "\n" + "="*60,
+            f"⏸️  PAUSE: {step_name}",
+            "="*60,
+            f"📋 {instructions}",
+            "\n🔗 Check your repository at:",
+            f"   https://github.com/{self.repo_owner}/{self.repo_name}",
+            "\n⌨️  Press Enter to continue to next step...",
+            "="*60
+        ]))
+        input()
+    
+    def react_to_issue(self, issue: Issue) -> None:
+        """Step 1: React to issue assignment with 👀 emoji."""
+        self.current_issue = issue
+        self.log(f"👀 Processing real issue: {issue.title}")
+        self.log("Starting real GitHub Copilot agent workflow...")
+        
+        self.pause_for_verification(
+            "Issue Recognition",
+            f"The agent has recognized issue: '{issue.title}'\n"
+            f"In a real scenario, you would see a 👀 reaction on the GitHub issue."
+        )
+    
+    def clone_and_analyze_repo(self) -> Dict[str, Any]:
+        """Step 2: Clone the actual repository and perform real analysis."""
+        self.log(f"📥 Cloning actual repository: {self.repo_url}")
+        
+        if self._clone_is_current():
+            self.log("✅ Existing clone is clean and up to date - skipping clone")
+        else:
+            # Remove existing directory if it exists
+            if self.repo_path.exists():
+                self.log("Removing existing repository directory...")
+                shutil.rmtree(self.repo_path, onerror=_remove_readonly)
+            
+            # Clone only the tip of the default branch - the agent never reads history
+            try:
+                result = subprocess.run(
+                    ["git", "clone", "--depth=1", "--single-branch", "--no-tags", self.repo_url, str(self.repo_path)],
+                    capture_output=True,
+                    text=True,
+                    check=True
+                )
+                self.log("✅ Repository cloned successfully")
+            except subprocess.CalledProcessError as e:
+                self.log(f"❌ Failed to clone repository: {e.stderr}", "ERROR")
+                raise
+        
+        self.log("🔍 Analyzing actual codebase structure...")
+        
+        # The tree sha hashes every tracked file, so an identical tree means an identical analysis.
+        # The clone is clean at this point (fresh, or checked by _clone_is_current).
+        tree_sha = self._get_tree_sha()
+        if tree_sha in self.analysis_cache:
+            self.log(f"♻️ Reusing cached analysis for tree {tree_sha[:7]}")
+            analysis = dict(self.analysis_cache[tree_sha])
+            self._repository_size = None
+        else:
+            # Perform real analysis of the repository
+            analysis = self._analyze_real_codebase()
+            if tree_sha:
+                self.analysis_cache[tree_sha] = analysis
+                # Keep only the most recent trees
+                while len(self.analysis_cache) > ANALYSIS_CACHE_SIZE:
+                    del self.analysis_cache[next(iter(self.analysis_cache))]
+            self._save_manifest()
+        self.analysis_results = analysis
+        
+        self.log(f"✅ Real analysis complete: {analysis['file_count']} files, {analysis['line_count']:,} lines")
+        self.log(f"📊 Languages found: {', '.join(analysis['languages'])}")
+        
+        self.pause_for_verification(
+            "Repository Analysis",
+            f"Repository has been cloned and analyzed.\n"
+            f"Found {analysis['file_count']} files with {analysis['line_count']} lines of code.\n"
+            f"Languages: {', '.join(analysis['languages'])}\n"
+            f"Check the cloned repository in your local directory: {self.repo_path}"
+        )
+        
+        return analysis
+    
+    def _clone_is_current(self) -> bool:
+        """Check whether an existing clone of this repository is clean and at the remote's HEAD."""
+        if not (self.repo_path / ".git").exists():
+            return False
+        
+        try:
+            # Forks share a name and usually a HEAD; only reuse a clone of the same URL
+            origin_url = subprocess.run(
+                ["git", "remote", "get-url", "origin"],
+                cwd=self.repo_path, capture_output=True, text=True, check=True
+            ).stdout.strip()
+            if origin_url != self.repo_url:
+                return False
+            
+            remote_head = subprocess.run(
+                ["git", "ls-remote", self.repo_url, "HEAD"],
+                capture_output=True, text=True, check=True
+            ).stdout.split()
+            local_head = subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                cwd=self.repo_path, capture_output=True, text=True, check=True
+            ).stdout.strip()
+            status = subprocess.run(
+                ["git", "status", "--porcelain"],
+                cwd=self.repo_path, capture_output=True, text=True, check=True
+            ).stdout
+        except (OSError, subprocess.CalledProcessError):
+            return False
+        
+        return bool(remote_head) and remote_head[0] == local_head and not status
+    
+    def _analyze_real_codebase(self) -> Dict[str, Any]:
+        """Perform actual analysis of the cloned repository."""
+        file_count = 0
+        line_count = 0
+        languages = set()
+        
+        file_paths = []
+        self._repository_size = None
+        blob_shas = self._get_blob_shas()
+        for entry in self._walk_files(self.repo_path):
+            file_count += 1
+            
+            # Unchanged content has the same blob sha, so reuse its cached line count
+            rel_path = os.path.relpath(entry.path, self.repo_path).replace(os.sep, '/')
+            sha = blob_shas.get(rel_path)
+            if sha in self.line_count_manifest:
+                line_count += self.line_count_manifest[sha]
+            else:
+                file_paths.append((entry.path, sha))
+            
+            # Detect language
+            name = entry.name
+            dot = name.rfind('.')
+            language = LANGUAGE_EXTENSIONS.get(name[dot:].lower()) if dot > 0 else None
+            if language:
+                languages.add(language)
+        
+        # Count lines - reads block on I/O, so overlap them across threads
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+            counts = executor.map(self._count_lines, [path for path, _ in file_paths])
+            for (_, sha), file_lines in zip(file_paths, counts):
+                line_count += file_lines
+                if sha:
+                    self.line_count_manifest[sha] = file_lines
+        
+        # Only blobs in this tree are worth keeping, or the manifest grows on every run
+        if blob_shas:
+            live_shas = set(blob_shas.values())
+            self.line_count_manifest = {
+                sha: lines for sha, lines in self.line_count_manifest.items() if sha in live_shas
+            }
+        
+        return {
+            "file_count": file_count,
+            "line_count": line_count,
+            "languages": list(languages)
+        }
+    
+    @property
+    def repository_size(self) -> str:
+        """Human-readable size of the analyzed files, walked and stat'ed only when first asked for."""
+        if self._repository_size is None:
+            total_size = 0
+            for entry in self._walk_files(self.repo_path):
+                try:
+                    total_size += entry.stat().st_size
+                except OSError:
+                    pass
+            self._repository_size = self._format_size(total_size)
+        return self._repository_size
+    
+    def _get_tree_sha(self) -> Optional[str]:
+        """Return the sha of the checked-out tree, or None if git can't tell us."""
+        try:
+            result = subprocess.run(
+                ["git", "rev-parse", "HEAD^{tree}"],
+                cwd=self.repo_path,
+                capture_output=True,
+                text=True,
+                check=True
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return result.stdout.strip() or None
+    
+    def _get_blob_shas(self) -> Dict[str, str]:
+        """Map tracked file paths to their git blob sha, read from the index without opening files."""
+        try:
+            result = subprocess.run(
+                ["git", "ls-files", "-s", "-z"],
+                cwd=self.repo_path,
+                capture_output=True,
+                check=True
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return {}
+        
+        blob_shas = {}
+        for record in result.stdout.split(b'\0'):
+            if record:
+                meta, path = record.split(b'\t', 1)
+                blob_shas[os.fsdecode(path)] = meta.split()[1].decode('ascii')
+        return blob_shas
+    
+    def _load_manifest(self) -> Dict[str, Any]:
+        """Load cached line counts and analyses from a previous run."""
+        try:
+            manifest = json_compat.loads(ANALYSIS_MANIFEST.read_bytes())
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != ANALYSIS_MANIFEST_VERSION:
+            return {}
+        return manifest
+    
+    def _save_manifest(self) -> None:
+        """Persist line counts and analyses so the next run only reads changed files."""
+        try:
+            ANALYSIS_MANIFEST.parent.mkdir(exist_ok=True)
+            # Cache data, not meant for humans - keep it compact
+            ANALYSIS_MANIFEST.write_bytes(json_compat.dumps({
+                "version": ANALYSIS_MANIFEST_VERSION,
+                "line_counts": self.line_count_manifest,
+                "analyses": self.analysis_cache
+            }))
+        except OSError as e:
+            self.log(f"Could not save analysis manifest: {e}", "WARNING")
+    
+    def _count_lines(self, file_path: str) -> int:
+        """Count the lines in a file, treating unreadable files as empty."""
+        lines = 0
+        last = b'\n'
+        try:
+            # Count raw newline bytes in 1 MiB chunks - no decoding, no per-line objects
+            with open(file_path, 'rb') as f:
+                while chunk := f.read(1 << 20):
+                    lines += chunk.count(b'\n')
+                    last = chunk[-1:]
+        except OSError:
+            return 0
+        # A final line without a trailing newline still counts
+        return lines + (last != b'\n')
+    
+    def _walk_files(self, directory) -> Iterator[os.DirEntry]:
+        """Yield every file under directory in one scandir pass, pruning SKIP_DIRS."""
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        yield from self._walk_files(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+    
+    def _format_size(self, total_size: int) -> str:
+        """Get human-readable size."""
+        # Each unit is 2**10 of the previous one, so the bit length picks the unit directly
+        exponent = min(4, max(0, (total_size.bit_length() - 1) // 10))
+        return f"{total_size / 1024 ** exponent:.1f} {SIZE_UNITS[exponent]}"
+    
+    def create_implementation_plan(self) -> List[Dict[str, str]]:
+        """Step 3: Create detailed implementation plan based on issue and real analysis."""
+        self.log("📋 Creating implementation plan based on real repository...")
+        
+        issue_keywords = self.current_issue.description.lower()
+        
+        plan = []
+        
+        # Check what actually exists in the repository
+        readme_exists = (self.repo_path / "README.md").exists()
+        
+        if "readme" in issue_keywords or "documentation" in issue_keywords or not readme_exists:
+            plan.append({
+                "step": "Create/Update README",
+                "file": "README.md",
+                "description": "Add comprehensive project documentation",
+                "reasoning": "Good documentation is essential for any project"
+            })
+        
+        if "example" in issue_keywords or "demo" in issue_keywords:
+            plan.append({
+                "step": "Create example script",
+                "file": "example_usage.py",
+                "description": "Add example showing how to use the project",
+                "reasoning": "Examples help users understand the project"
+            })
+        
+        if "test" in issue_keywords or "testing" in issue_keywords:
+            plan.append({
+                "step": "Add test file",
+                "file": "test_basic.py", 
+                "description": "Add basic unit tests",
+                "reasoning": "Tests ensure code quality and reliability"
+            })
+        
+        if "config" in issue_keywords or "configuration" in issue_keywords:
+            plan.append({
+                "step": "Add configuration",
+                "file": "config.json",
+                "description": "Add project configuration file",
+                "reasoning": "Configuration files make projects more flexible"
+            })
+        
+        # Default plan if no specific keywords found
+        if not plan:
+            plan = [
+                {
+                    "step": "Update README",
+                    "file": "README.md",
+                    "description": "Improve project documentation",
+                    "reasoning": "Based on issue requirements"
+                },
+                {
+                    "step": "Add example",
+                    "file": "example.py",
+                    "description": "Add practical example",
+                    "reasoning": "Enhance project usability"
+                }
+            ]
+        
+        for i, step in enumerate(plan, 1):
+            self.log(f"📌 Step {i}: {step['step']} - {step['description']}")
+        
+        self.pause_for_verification(
+            "Implementation Plan Created",
+            f"Created implementation plan with {len(plan)} steps:\n" +
+            "\n".join(f"  {i+1}. {step['step']}: {step['description']}" for i, step in enumerate(plan))
+        )
+        
+        return plan
+    
+    def generate_real_code_changes(self, plan: List[Dict[str, str]]) -> List[CodeChange]:
+        """Step 4: Generate actual code changes and write real files."""
+        self.log("⚙️ Generating real code changes...")
+        changes = []
+        
+        contents = []
+        for step in plan:
+            self.log(f"🔧 Working on: {step['step']}")
+            
+            # Generate actual content based on the file type
+            if step['file'] == "README.md":
+                content = self._generate_readme_content()
+            elif step['file'].endswith('.py'):
+                content = self._generate_python_content(step['file'])
+            elif step['file'].endswith('.json'):
+                content = self._generate_json_content()
+            else:
+                content = f"# {step['description']}\n\nThis file was created by Copilot Agent.\n"
+            contents.append(content)
+        
+        # Write the actual files - each is independent I/O, so do them concurrently
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            lines_before_list = list(executor.map(
+                self._write_plan_file,
+                [self.repo_path / step['file'] for step in plan],
+                contents
+            ))
+        
+        for step, content, lines_before in zip(plan, contents, lines_before_list):
+            lines_after = self._count_text_lines(content)
+            lines_added = lines_after - lines_before if lines_before > 0 else lines_after
+            lines_removed = max(0, lines_before - lines_after) if lines_before > 0 else 0
+            
+            change = CodeChange(
+                file_path=step['file'],
+                change_type="create" if lines_before == 0 else "modify",
+                description=step['description'],
+                lines_added=max(0, lines_added),
+                lines_removed=lines_removed,
+                reasoning=step['reasoning'],
+                actual_content=content[:200] + "..." if len(content) > 200 else content
+            )
+            
+            changes.append(change)
+            self.log(f"✅ Created: {step['file']} (+{change.lines_added} lines)")
+        
+        self.pause_for_verification(
+            "Code Changes Generated",
+            f"Generated {len(changes)} real file changes.\n"
+            f"Check the files in your local repository: {self.repo_path}\n"
+            f"Files created/modified: {', '.join(c.file_path for c in changes)}"
+        )
+        
+        return changes
+    
+    def _write_plan_file(self, file_path: Path, content: str) -> int:
+        """Write one generated file and return how many lines it had before."""
+        # One read doubles as the existence check
+        try:
+            lines_before = self._count_text_lines(file_path.read_text(encoding='utf-8', errors='ignore'))
+        except FileNotFoundError:
+            lines_before = 0
+        
+        # Bytes mode: no newline translation, so the file matches the counts
+        file_path.write_bytes(content.encode('utf-8'))
+        return lines_before
+    
+    def _count_text_lines(self, text: str) -> int:
+        """Count lines in text the way iterating over a file would."""
+        return text.count('\n') + (bool(text) and not text.endswith('\n'))
+    
+    def _generate_readme_content(self) -> str:
+        """Generate comprehensive README content."""
+        return README_TEMPLATE.format_map({
+            "repo_name": self.repo_name,
+            "repo_owner": self.repo_owner,
+            "generated_at": datetime.now().strftime('%Y-%m-%d at %H:%M:%S')
+        })
+    
+    def _generate_python_content(self, filename: str) -> str:
+        """Generate Python file content based on filename."""
+        if "example" in filename.lower():
+            return EXAMPLE_PY
+        elif "test" in filename.lower():
+            return TEST_PY
+        else:
+            return PY_MODULE_TEMPLATE.format_map({
+                "filename": filename,
+                "generated_at": datetime.now().strftime('%Y-%m-%d at %H:%M:%S')
+            })
+    
+    def _generate_json_content(self) -> str:
+        """Generate JSON configuration content."""
+        config = {
+            "project_name": self.repo_name,
+            "copilot_agent": {
+                "version": "1.0",
+                "created_at": datetime.now().isoformat(),
+                "capabilities": [
+                    "code_generation",
                     "issue_processing", 
                     "pr_creation",
                     "workflow_automation"
@@ -604,80 +849,85 @@ if __name__ == "__main__":
                 "notify_completion": True
             }
         }
-        return json.dumps(config, indent=2)
+        return json_compat.dumps_indented(config).decode('utf-8')
     
     def create_real_commits(self, changes: List[CodeChange]) -> List[Commit]:
         """Step 5: Create actual git commits with real changes."""
         self.log("📝 Creating real git commits...")
         
-        # Change to repository directory
-        original_cwd = os.getcwd()
-        os.chdir(self.repo_path)
+        # Create and checkout new branch
+        subprocess.run(["git", "checkout", "-b", self.branch_name],
+                       cwd=self.repo_path, check=True, capture_output=True)
+        self.log(f"✅ Created and switched to branch: {self.branch_name}")
         
-        try:
-            # Create and checkout new branch
-            subprocess.run(["git", "checkout", "-b", self.branch_name], check=True, capture_output=True)
-            self.log(f"✅ Created and switched to branch: {self.branch_name}")
-            
-            commits = []
-            
-            # Group changes and create commits
-            commit_groups = self._group_changes_for_commits(changes)
-            
-            for i, (commit_msg, commit_changes) in enumerate(commit_groups, 1):
-                # Add files to git
-                for change in commit_changes:
-                    subprocess.run(["git", "add", change.file_path], check=True, capture_output=True)
-                
-                # Create commit
-                result = subprocess.run(
-                    ["git", "commit", "-m", commit_msg],
-                    check=True, 
-                    capture_output=True,
-                    text=True
-                )
-                
-                # Get commit SHA
-                sha_result = subprocess.run(
-                    ["git", "rev-parse", "HEAD"],
-                    check=True,
-                    capture_output=True, 
-                    text=True
-                )
-                sha = sha_result.stdout.strip()
-                
-                commit = Commit(
-                    sha=sha,
-                    message=commit_msg,
-                    changes=commit_changes,
-                    timestamp=datetime.now().isoformat(),
-                    validation_status="passed"
-                )
-                
-                commits.append(commit)
-                self.log(f"📝 Created real commit {sha[:7]}: {commit_msg}")
-            
-            self.pause_for_verification(
-                "Git Commits Created",
-                f"Created {len(commits)} real git commits on branch '{self.branch_name}'.\n"
-                f"Check your repository's commit history:\n"
-                f"  git log --oneline\n"
-                f"Or view on GitHub after pushing the branch."
+        commits = []
+        
+        # Group changes and create commits
+        commit_groups = self._group_changes_for_commits(changes)
+        
+        for commit_msg, commit_changes in commit_groups:
+            # Stage every file of this commit in one git call
+            subprocess.run(
+                ["git", "add", "--", *[change.file_path for change in commit_changes]],
+                cwd=self.repo_path, check=True, capture_output=True
             )
             
-            return commits
+            # Create commit
+            subprocess.run(
+                ["git", "commit", "--quiet", "-m", commit_msg],
+                cwd=self.repo_path,
+                check=True, 
+                capture_output=True,
+                text=True
+            )
             
-        finally:
-            os.chdir(original_cwd)
+            commits.append(Commit(
+                sha="",
+                message=commit_msg,
+                changes=commit_changes,
+                timestamp=datetime.now().isoformat(),
+                validation_status="passed"
+            ))
+        
+        # Resolve all new commit SHAs with a single rev-list (newest first)
+        if commits:
+            sha_result = subprocess.run(
+                ["git", "rev-list", f"--max-count={len(commits)}", "HEAD"],
+                cwd=self.repo_path,
+                check=True,
+                capture_output=True, 
+                text=True
+            )
+            for commit, sha in zip(reversed(commits), sha_result.stdout.split()):
+                commit.sha = sha
+        
+        for commit in commits:
+            self.log(f"📝 Created real commit {commit.sha[:7]}: {commit.message}")
+        
+        self.pause_for_verification(
+            "Git Commits Created",
+            f"Created {len(commits)} real git commits on branch '{self.branch_name}'.\n"
+            f"Check your repository's commit history:\n"
+            f"  git log --oneline\n"
+            f"Or view on GitHub after pushing the branch."
+        )
+        
+        return commits
     
     def _group_changes_for_commits(self, changes: List[CodeChange]) -> List[tuple]:
         """Group changes into logical commits."""
         groups = []
         
-        readme_changes = [c for c in changes if "readme" in c.file_path.lower()]
-        python_changes = [c for c in changes if c.file_path.endswith('.py')]
-        config_changes = [c for c in changes if c.file_path.endswith('.json')]
-        other_changes = [c for c in changes if c not in readme_changes + python_changes + config_changes]
+        readme_changes, python_changes, config_changes, other_changes = [], [], [], []
+        for c in changes:
+            if "readme" in c.file_path.lower():
+                readme_changes.append(c)
+            elif c.file_path.endswith('.py'):
+                python_changes.append(c)
+            elif c.file_path.endswith('.json'):
+                config_changes.append(c)
+            else:
+                other_changes.append(c)
         
         if readme_changes:
             groups.append(("docs: update project documentation", readme_changes))
@@ -694,12 +944,10 @@ if __name__ == "__main__":
         """Push the new branch to GitHub."""
         self.log(f"📤 Pushing branch '{self.branch_name}' to GitHub...")
         
-        original_cwd = os.getcwd()
-        os.chdir(self.repo_path)
-        
         try:
             result = subprocess.run(
                 ["git", "push", "-u", "origin", self.branch_name],
+                cwd=self.repo_path,
                 check=True,
                 capture_output=True,
                 text=True
@@ -716,8 +964,6 @@ if __name__ == "__main__":
         except subprocess.CalledProcessError as e:
             self.log(f"❌ Failed to push branch: {e.stderr}", "ERROR")
             raise
-        finally:
-            os.chdir(original_cwd)
     
     def create_github_pull_request(self, commits: List[Commit]) -> PullRequest:
         """Step 6: Create actual GitHub pull request (requires GitHub token)."""
@@ -725,10 +971,8 @@ if __name__ == "__main__":
         
         pr_title = f"🤖 Copilot Agent: {self.current_issue.title}"
         
-        total_additions = sum(sum(c.lines_added for c in commit.changes) for commit in commits)
-        total_deletions = sum(sum(c.lines_removed for c in commit.changes) for commit in commits)
-        
-        pr_description = f"""## 🤖 Automated Implementation by Copilot Agent
+        buf = io.StringIO()
+        buf.write(f"""## 🤖 Automated Implementation by Copilot Agent
 
 ### Issue Addressed
 This pull request addresses: **{self.current_issue.title}**
@@ -737,14 +981,18 @@ This pull request addresses: **{self.current_issue.title}**
 {self.current_issue.description[:200]}...
 
 ### Changes Made
-"""
+""")
         
+        # Totals are summed in the same walk that lists the changes
+        total_additions = total_deletions = 0
         for commit in commits:
-            pr_description += f"\n**{commit.message}** (`{commit.sha[:7]}`)\n"
+            buf.write(f"\n**{commit.message}** (`{commit.sha[:7]}`)\n")
             for change in commit.changes:
-                pr_description += f"- {change.description} (+{change.lines_added} -{change.lines_removed})\n"
+                buf.write(f"- {change.description} (+{change.lines_added} -{change.lines_removed})\n")
+                total_additions += change.lines_added
+                total_deletions += change.lines_removed
         
-        pr_description += f"""
+        buf.write(f"""
 
 ### Statistics
 - 📊 **{len(commits)} commits** with {total_additions} additions and {total_deletions} deletions
@@ -752,11 +1000,11 @@ This pull request addresses: **{self.current_issue.title}**
 - 🤖 **Generated by**: GitHub Copilot Agent
 
 ### Files Changed
-"""
+""")
         for change in commits[0].changes:
-            pr_description += f"- `{change.file_path}` - {change.description}\n"
+            buf.write(f"- `{change.file_path}` - {change.description}\n")
         
-        pr_description += f"""
+        buf.write(f"""
 
 ### Agent Process Log
 The Copilot agent followed this workflow:
@@ -771,7 +1019,8 @@ The Copilot agent followed this workflow:
 
 ---
 *This pull request was automatically created by GitHub Copilot Agent on {datetime.now().strftime('%Y-%m-%d at %H:%M:%S')}*
-"""
+""")
+        pr_description = buf.getvalue()
         
         pr = PullRequest(
             id=None,  # Will be set if API call succeeds
@@ -795,12 +1044,8 @@ The Copilot agent followed this workflow:
                     "draft": True
                 }
                 
-                response = requests.post(
+                response = self._gh.post(
                     f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}/pulls",
-                    headers={
-                        "Authorization": f"token {self.github_token}",
-                        "Accept": "application/vnd.github.v3+json"
-                    },
                     json=pr_data
                 )
                 
@@ -830,29 +1075,32 @@ The Copilot agent followed this workflow:
         """Step 7: Notify user that work is complete."""
         self.log("📧 Workflow completed successfully!")
         
-        print("\n" + "="*60)
-        print("🎉 REAL COPILOT AGENT WORKFLOW COMPLETE!")
-        print("="*60)
-        print(f"✅ Issue processed: {self.current_issue.title}")
-        print(f"🌿 Branch created: {self.branch_name}")
-        print(f"📝 Commits made: {len(self.current_pr.commits)}")
-        if self.current_pr.id:
-            print(f"🔀 GitHub PR created: #{self.current_pr.id}")
-        print(f"⏱️  Total steps: {len(self.logs)}")
-        print("\n🔗 Check your repository:")
-        print(f"   https://github.com/{self.repo_owner}/{self.repo_name}")
-        print("\n📋 What happened:")
-        print("1. ✅ Cloned your actual repository")
-        print("2. ✅ Analyzed real codebase")
-        print("3. ✅ Created implementation plan")
-        print("4. ✅ Generated and wrote real files")
-        print("5. ✅ Made actual git commits")
-        print("6. ✅ Pushed branch to GitHub")
+        lines = [
+            "\n" + "="*60,
+            "🎉 REAL COPILOT AGENT WORKFLOW COMPLETE!",
+            "="*60,
+            f"✅ Issue processed: {self.current_issue.title}",
+            f"🌿 Branch created: {self.branch_name}",
+            f"📝 Commits made: {len(self.current_pr.commits)}"
+        ]
         if self.current_pr.id:
-            print("7. ✅ Created real GitHub pull request")
-        else:
-            print("7. ⚠️  PR ready (create manually or provide GitHub token)")
-        print("="*60)
+            lines.append(f"🔀 GitHub PR created: #{self.current_pr.id}")
+        lines += [
+            f"⏱️  Total steps: {len(self.logs)}",
+            "\n🔗 Check your repository:",
+            f"   https://github.com/{self.repo_owner}/{self.repo_name}",
+            "\n📋 What happened:",
+            "1. ✅ Cloned your actual repository",
+            "2. ✅ Analyzed real codebase",
+            "3. ✅ Created implementation plan",
+            "4. ✅ Generated and wrote real files",
+            "5. ✅ Made actual git commits",
+            "6. ✅ Pushed branch to GitHub",
+            "7. ✅ Created real GitHub pull request" if self.current_pr.id
+            else "7. ⚠️  PR ready (create manually or provide GitHub token)",
+            "="*60
+        ]
+        print("\n".join(lines))
     
     def run_complete_workflow(self, issue: Issue) -> PullRequest:
         """Run the complete real Copilot agent workflow."""
@@ -887,6 +1135,7 @@ The Copilot agent followed this workflow:
         return pr
 
 
+@lru_cache(maxsize=1)
 def create_test_issue() -> Issue:
     """Create a test issue for the demo."""
     return Issue(
@@ -909,8 +1158,7 @@ Requirements:
 - Proper project structure
         """,
         labels=["enhancement", "documentation", "examples"],
-        assignee="@copilot",
-        created_at=datetime.now().isoformat()
+        assignee="@copilot"
     )
 
 
@@ -962,8 +1210,8 @@ Example usage:
     try:
         # Create agent and test issue
         agent = RealCopilotAgent(args.repo, github_token)
-        issue = create_test_issue()
-        issue.title = args.issue_title
+        # create_test_issue() returns a shared cached instance - copy it, don't mutate it
+        issue = replace(create_test_issue(), title=args.issue_title)
         
         # Run complete real workflow
         pr = agent.run_complete_workflow(issue)
@@ -13,17 +13,46 @@ This script simulates the complete workflow of how GitHub Copilot coding agents
 This demonstrates the behind-the-scenes process of automated coding agents.
 """
 
-import json
+import io
 import time
 import random
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field, fields, is_dataclass
 from pathlib import Path
 import argparse
 
+import json_compat
 
-@dataclass
+
+# Plan keywords, one named group per plan branch, matched in a single pass.
+# Whole words (plurals allowed) so "build" or "guide" don't count as UI work.
+PLAN_KEYWORDS_RE = re.compile(r"\b(?:(?P<api>apis?|endpoints?)|(?P<ui>uis?|frontends?))\b", re.IGNORECASE)
+
+# Commit groups in commit order: message -> file path markers. A change joins
+# every group it matches; the fallback group takes changes no other group claims.
+FALLBACK_COMMIT_MESSAGE = "fix: resolve reported issues"
+COMMIT_GROUPS = {
+    "feat: add new API endpoints": ("api", "route"),
+    "feat: add new UI components": ("component", "style"),
+    FALLBACK_COMMIT_MESSAGE: (),
+    "test: add comprehensive test coverage": ("test",),
+}
+
+
+def json_default(obj):
+    """Serialize dataclasses field by field for JSON backends without native support."""
+    # Shallow field mapping - nested dataclasses come back through this hook
+    # as the encoder reaches them, so no deep asdict() copy is ever built
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    return str(obj)
+
+
+@dataclass(slots=True, frozen=True)
 class Issue:
     """Represents a GitHub issue assigned to the coding agent."""
     id: int
@@ -31,11 +60,11 @@ class Issue:
     description: str
     labels: List[str]
     assignee: str
-    created_at: str
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
     status: str = "open"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CodeChange:
     """Represents a code change made by the agent."""
     file_path: str
@@ -46,7 +75,7 @@ class CodeChange:
     reasoning: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Commit:
     """Represents a git commit made by the agent."""
     sha: str
@@ -56,7 +85,8 @@ class Commit:
     validation_status: str
 
 
-@dataclass
+# Not frozen: review feedback updates the status and appends commits
+@dataclass(slots=True)
 class PullRequest:
     """Represents the draft pull request created by the agent."""
     id: int
@@ -76,32 +106,45 @@ class CopilotAgent:
     to pull request creation and review handling.
     """
     
-    def __init__(self, repo_name: str):
+    def __init__(self, repo_name: str, simulate_delay: float = 0.0):
         self.repo_name = repo_name
+        self.simulate_delay = simulate_delay  # scale for simulated work time; 0 disables it
         self.agent_id = "copilot-agent-v2"
         self.current_issue: Optional[Issue] = None
         self.current_pr: Optional[PullRequest] = None
         self.logs: List[str] = []
         self.analysis_results: Dict[str, Any] = {}
+        self._log_second = -1
+        self._log_timestamp = ""
     
     def log(self, message: str, level: str = "INFO") -> None:
         """Add a log entry with timestamp."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Timestamps only have second resolution, so format each second once
+        now = int(time.time())
+        if now != self._log_second:
+            self._log_second = now
+            self._log_timestamp = datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = self._log_timestamp
         log_entry = f"[{timestamp}] [{level}] {message}"
         self.logs.append(log_entry)
         print(f"🤖 {log_entry}")
     
+    def _simulate_latency(self, seconds: float) -> None:
+        """Stand in for real work time, only when latency simulation is enabled."""
+        if self.simulate_delay:
+            time.sleep(seconds * self.simulate_delay)
+    
     def react_to_issue(self, issue: Issue) -> None:
         """Step 1: React to issue assignment with 👀 emoji."""
         self.current_issue = issue
         self.log(f"👀 Reacting to issue #{issue.id}: {issue.title}")
         self.log("Starting background job powered by GitHub Actions...")
-        time.sleep(1)  # Simulate processing time
+        self._simulate_latency(1)  # Simulate processing time
     
     def clone_and_analyze_repo(self) -> Dict[str, Any]:
         """Step 2: Clone repository and perform codebase analysis."""
         self.log(f"📥 Cloning repository: {self.repo_name}")
-        time.sleep(2)  # Simulate cloning
+        self._simulate_latency(2)  # Simulate cloning
         
         self.log("🔍 Analyzing codebase structure...")
         
@@ -133,10 +176,11 @@ class CopilotAgent:
         self.log("📋 Creating implementation plan...")
         
         # Analyze the issue and create a plan
-        issue_keywords = self.current_issue.description.lower()
+        # One regex pass over the body collects which plan branches it asks for
+        issue_keywords = {m.lastgroup for m in PLAN_KEYWORDS_RE.finditer(self.current_issue.description)}
         
         plan = []
-        if "api" in issue_keywords or "endpoint" in issue_keywords:
+        if "api" in issue_keywords:
             plan.extend([
                 {
                     "step": "Create API endpoint",
@@ -158,7 +202,7 @@ class CopilotAgent:
                 }
             ])
         
-        if "ui" in issue_keywords or "frontend" in issue_keywords:
+        if "ui" in issue_keywords:
             plan.extend([
                 {
                     "step": "Create React component",
@@ -202,7 +246,7 @@ class CopilotAgent:
         
         for step in plan:
             self.log(f"🔧 Working on: {step['step']}")
-            time.sleep(1)  # Simulate code generation time
+            self._simulate_latency(1)  # Simulate code generation time
             
             # Simulate different types of code changes
             if "test" in step['file']:
@@ -251,10 +295,11 @@ class CopilotAgent:
         ]
         
         all_passed = True
-        for validation in validations:
-            time.sleep(0.5)  # Simulate validation time
-            passed = random.random() > 0.1  # 90% success rate
-            
+        # The checks are independent, so run them side by side and report in order
+        with ThreadPoolExecutor(max_workers=len(validations)) as executor:
+            results = list(executor.map(self._run_validation, validations))
+        
+        for validation, passed in zip(validations, results):
             if passed:
                 self.log(f"✅ {validation}: PASSED")
             else:
@@ -266,11 +311,16 @@ class CopilotAgent:
         else:
             self.log("⚠️ Some validations failed - will fix issues", "WARNING")
             # Simulate fixing issues
-            time.sleep(2)
+            self._simulate_latency(2)
             self.log("🔧 Fixed validation issues")
         
         return True
     
+    def _run_validation(self, validation: str) -> bool:
+        """Run a single validation check."""
+        self._simulate_latency(0.5)  # Simulate validation time
+        return random.random() > 0.1  # 90% success rate
+    
     def create_commits(self, changes: List[CodeChange]) -> List[Commit]:
         """Step 6: Create git commits with the changes."""
         self.log("📝 Creating git commits...")
@@ -279,9 +329,13 @@ class CopilotAgent:
         # Group changes into logical commits
         commit_groups = self._group_changes_into_commits(changes)
         
+        # One clock read and one batch of unique fake SHAs for the whole run
+        base_time = datetime.now()
+        shas = [f"abc{n}" for n in random.sample(range(1000, 10000), len(commit_groups))]
+        
         for i, (commit_msg, commit_changes) in enumerate(commit_groups, 1):
-            sha = f"abc{random.randint(1000, 9999)}"
-            timestamp = (datetime.now() + timedelta(minutes=i)).isoformat()
+            sha = shas[i - 1]
+            timestamp = (base_time + timedelta(minutes=i)).isoformat()
             
             commit = Commit(
                 sha=sha,
@@ -298,24 +352,19 @@ class CopilotAgent:
     
     def _group_changes_into_commits(self, changes: List[CodeChange]) -> List[tuple]:
         """Group related changes into logical commits."""
-        groups = []
-        
-        # Group by change type and related functionality
-        api_changes = [c for c in changes if "api" in c.file_path or "route" in c.file_path]
-        test_changes = [c for c in changes if "test" in c.file_path]
-        ui_changes = [c for c in changes if "component" in c.file_path or "style" in c.file_path]
-        other_changes = [c for c in changes if c not in api_changes + test_changes + ui_changes]
-        
-        if api_changes:
-            groups.append(("feat: add new API endpoints", api_changes))
-        if ui_changes:
-            groups.append(("feat: add new UI components", ui_changes))
-        if other_changes:
-            groups.append(("fix: resolve reported issues", other_changes))
-        if test_changes:
-            groups.append(("test: add comprehensive test coverage", test_changes))
-        
-        return groups
+        buckets: Dict[str, List[CodeChange]] = {message: [] for message in COMMIT_GROUPS}
+        
+        # Group by change type and related functionality in a single pass
+        for c in changes:
+            claimed = False
+            for message, markers in COMMIT_GROUPS.items():
+                if any(marker in c.file_path for marker in markers):
+                    buckets[message].append(c)
+                    claimed = True
+            if not claimed:
+                buckets[FALLBACK_COMMIT_MESSAGE].append(c)
+        
+        return [(message, group) for message, group in buckets.items() if group]
     
     def create_draft_pull_request(self, commits: List[Commit]) -> PullRequest:
         """Step 7: Create draft pull request with commits and detailed logs."""
@@ -324,24 +373,26 @@ class CopilotAgent:
         # Generate PR title and description
         pr_title = f"Fix: {self.current_issue.title}"
         
-        total_additions = sum(sum(c.lines_added for c in commit.changes) for commit in commits)
-        total_deletions = sum(sum(c.lines_removed for c in commit.changes) for commit in commits)
-        
-        pr_description = f"""
+        buf = io.StringIO()
+        buf.write(f"""
 ## 🤖 Automated fix for issue #{self.current_issue.id}
 
 ### Summary
 This pull request addresses the issue: "{self.current_issue.title}"
 
 ### Changes Made
-"""
+""")
         
+        # Totals are summed in the same walk that lists the changes
+        total_additions = total_deletions = 0
         for commit in commits:
-            pr_description += f"\n**{commit.message}** (`{commit.sha[:7]}`)\n"
+            buf.write(f"\n**{commit.message}** (`{commit.sha[:7]}`)\n")
             for change in commit.changes:
-                pr_description += f"- {change.description} (+{change.lines_added} -{change.lines_removed})\n"
+                buf.write(f"- {change.description} (+{change.lines_added} -{change.lines_removed})\n")
+                total_additions += change.lines_added
+                total_deletions += change.lines_removed
         
-        pr_description += f"""
+        buf.write(f"""
 ### Statistics
 - 📊 **{len(commits)} commits** with {total_additions} additions and {total_deletions} deletions
 - 🧪 **All validations passed**
@@ -349,12 +400,12 @@ This pull request addresses the issue: "{self.current_issue.title}"
 
 ### Agent Reasoning Log
 The agent analyzed the codebase and determined:
-"""
+""")
         
         for change in commits[0].changes:  # Show reasoning for first commit
-            pr_description += f"- {change.reasoning}\n"
+            buf.write(f"- {change.reasoning}\n")
         
-        pr_description += f"""
+        buf.write("""
 ### Validation Results
 ✅ Syntax validation
 ✅ Type checking
@@ -363,7 +414,8 @@ The agent analyzed the codebase and determined:
 ✅ Integration tests
 
 **Ready for review!** 🎉
-"""
+""")
+        pr_description = buf.getvalue()
         
         pr = PullRequest(
             id=random.randint(1000, 9999),
@@ -407,7 +459,7 @@ The agent analyzed the codebase and determined:
         else:
             self.log("🔄 Processing feedback and updating PR...")
             # Simulate addressing feedback
-            time.sleep(2)
+            self._simulate_latency(2)
             
             # Add a new commit addressing feedback
             feedback_commit = Commit(
@@ -468,8 +520,8 @@ The agent analyzed the codebase and determined:
             "workflow_id": f"copilot-{datetime.now().strftime('%Y%m%d-%H%M%S')}",
             "agent_id": self.agent_id,
             "repository": self.repo_name,
-            "issue": asdict(self.current_issue) if self.current_issue else None,
-            "pull_request": asdict(self.current_pr) if self.current_pr else None,
+            "issue": self.current_issue,
+            "pull_request": self.current_pr,
             "analysis_results": self.analysis_results,
             "complete_logs": self.logs,
             "summary": {
@@ -483,12 +535,14 @@ The agent analyzed the codebase and determined:
             }
         }
         
-        with open(filename, 'w') as f:
-            json.dump(summary, f, indent=2, default=str)
+        # orjson writes the dataclasses itself; json_default covers the fallback backends
+        with open(filename, 'wb') as f:
+            f.write(json_compat.dumps_indented(summary, default=json_default))
         
         print(f"📄 Workflow summary exported to: {filename}")
 
 
+@lru_cache(maxsize=1)
 def create_sample_issue() -> Issue:
     """Create a sample GitHub issue for demonstration."""
     return Issue(
@@ -519,8 +573,7 @@ UI requirements:
 - Responsive design with Tailwind CSS
         """,
         labels=["enhancement", "api", "frontend", "high-priority"],
-        assignee="@copilot",
-        created_at=datetime.now().isoformat()
+        assignee="@copilot"
     )
 
 
@@ -554,6 +607,16 @@ This demo simulates the complete workflow:
         help="Export workflow summary to JSON file"
     )
     
+    parser.add_argument(
+        "--simulate-latency",
+        type=float,
+        nargs="?",
+        const=1.0,
+        default=0.0,
+        metavar="SCALE",
+        help="Pause between steps to mimic real agent timing (optionally scaled, e.g. 0.5)"
+    )
+    
     parser.add_argument(
         "--feedback", 
         help="Simulate review feedback (e.g., 'Please add more error handling')"
@@ -562,7 +625,7 @@ This demo simulates the complete workflow:
     args = parser.parse_args()
     
     # Create agent and sample issue
-    agent = CopilotAgent(args.repo)
+    agent = CopilotAgent(args.repo, simulate_delay=args.simulate_latency)
     issue = create_sample_issue()
     
     try:
@@ -12,23 +12,59 @@ This script demonstrates various capabilities of a coding agent:
 
 import os
 import subprocess
-import json
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, asdict, replace
 from datetime import datetime
 import argparse
+from collections import Counter
+from itertools import islice
 
+import json_compat
 
-@dataclass
+
+# Finished analyses, keyed by repository path and the commit every ref points at
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "git_analyzer"
+CACHE_SIZE = 10
+CACHE_VERSION = 2
+
+
+def _count_lines(file_path: Path) -> int:
+    """Count the lines in a file, treating unreadable and binary files as empty."""
+    lines = 0
+    last = b'\n'
+    try:
+        # Unbuffered: the chunks go straight from read() into bytes, without a copy
+        # through BufferedReader. Short reads are fine, only b'' means end of file.
+        with open(file_path, 'rb', buffering=0) as f:
+            # Same check git uses: a NUL byte in the first 8000 bytes means binary
+            chunk = f.read(8000)
+            if b'\0' in chunk:
+                return 0
+            # bytes.count() scans each 1 MiB chunk with memchr - no decoding, no per-line objects
+            while chunk:
+                lines += chunk.count(b'\n')
+                last = chunk[-1:]
+                chunk = f.read(1 << 20)
+    except OSError:
+        # Missing files, directories (submodules) and unreadable files
+        return 0
+    # A final line without a trailing newline still counts
+    return lines + (last != b'\n')
+
+
+@dataclass(slots=True, frozen=True)
 class GitStats:
     """Data class to hold Git repository statistics."""
     total_commits: int
     total_files: int
-    total_lines: int
+    total_lines: Optional[int]  # None when line counting was skipped
     contributors: List[str]
     last_commit_date: str
-    repository_size: str
+    repository_size: Optional[str]  # None when sizing was skipped
 
 
 class GitAnalyzer:
@@ -42,17 +78,23 @@ class GitAnalyzer:
     - Use modern Python features
     """
     
-    def __init__(self, repo_path: str):
+    def __init__(self, repo_path: str, jobs: Optional[int] = None, use_cache: bool = True):
         """
         Initialize the Git analyzer.
         
         Args:
             repo_path: Path to the Git repository to analyze
+            jobs: Number of files to read in parallel (default: based on CPU count)
+            use_cache: Reuse results from an earlier run of the same clean checkout
             
         Raises:
             ValueError: If the path is not a valid Git repository
         """
         self.repo_path = Path(repo_path).resolve()
+        self.jobs = jobs or min(32, (os.cpu_count() or 1) * 4)
+        self.use_cache = use_cache
+        self._history: Optional[Dict[str, Any]] = None
+        self._git_output: Dict[Tuple[str, ...], str] = {}
         self._validate_git_repo()
     
     def _validate_git_repo(self) -> None:
@@ -68,6 +110,10 @@ class GitAnalyzer:
         """
         Execute a Git command and return the output.
         
+        Output is remembered per analyzer, so repeating a command (e.g. calling
+        analyze() twice) doesn't spawn git again. Use clear_cache() after the
+        repository has changed.
+        
         Args:
             command: List of command parts (e.g., ['log', '--oneline'])
             
@@ -77,6 +123,10 @@ class GitAnalyzer:
         Raises:
             subprocess.CalledProcessError: If the Git command fails
         """
+        key = tuple(command)
+        if key in self._git_output:
+            return self._git_output[key]
+        
         full_command = ["git"] + command
         try:
             result = subprocess.run(
@@ -86,7 +136,8 @@ class GitAnalyzer:
                 text=True,
                 check=True
             )
-            return result.stdout.strip()
+            self._git_output[key] = result.stdout.strip()
+            return self._git_output[key]
         except subprocess.CalledProcessError as e:
             raise subprocess.CalledProcessError(
                 e.returncode, 
@@ -94,76 +145,162 @@ class GitAnalyzer:
                 f"Git command failed: {e.stderr}"
             )
     
+    def clear_cache(self) -> None:
+        """Forget Git output and history collected so far, e.g. after new commits."""
+        self._git_output.clear()
+        self._history = None
+    
+    def _collect_history(self) -> Dict[str, Any]:
+        """
+        Walk the commit history once and collect everything the report needs from it.
+        
+        A single streamed `git log --all` replaces separate rev-list, shortlog and
+        log calls. Commits reachable from HEAD are found by following the parent
+        links, so the commit count and last commit date still describe HEAD while
+        contributors cover all refs.
+        
+        Returns:
+            Dict with commit_count, contributors and last_commit_date
+            
+        Raises:
+            subprocess.CalledProcessError: If the Git command fails
+        """
+        if self._history is not None:
+            return self._history
+        
+        # Author name last: it is the only field that could contain a tab
+        command = ["git", "log", "--all", "--format=%H%x09%P%x09%ci%x09%D%x09%aN"]
+        parents: Dict[str, List[str]] = {}
+        authors: Counter = Counter()
+        head = None
+        last_commit_date = "Unknown"
+        
+        process = subprocess.Popen(
+            command,
+            cwd=self.repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            encoding="utf-8",
+            errors="replace"
+        )
+        for line in process.stdout:
+            sha, parent_shas, date, refs, author = line.rstrip("\n").split("\t", 4)
+            parents[sha] = parent_shas.split()
+            authors[author] += 1
+            if refs == "HEAD" or refs.startswith(("HEAD ->", "HEAD,")):
+                head = sha
+                last_commit_date = date
+        stderr = process.stderr.read()
+        if process.wait() != 0:
+            raise subprocess.CalledProcessError(
+                process.returncode,
+                command,
+                f"Git command failed: {stderr}"
+            )
+        
+        # Count the commits reachable from HEAD
+        reachable = set()
+        stack = [head] if head else []
+        while stack:
+            sha = stack.pop()
+            if sha in reachable or sha not in parents:
+                continue
+            reachable.add(sha)
+            stack.extend(parents[sha])
+        
+        self._history = {
+            "commit_count": len(reachable),
+            # Most commits first, like `git shortlog -sn`
+            "contributors": [name for name, _ in sorted(authors.items(), key=lambda item: (-item[1], item[0]))],
+            "last_commit_date": last_commit_date
+        }
+        return self._history
+    
     def get_commit_count(self) -> int:
         """Get the total number of commits in the repository."""
         try:
-            output = self._run_git_command(["rev-list", "--count", "HEAD"])
-            return int(output)
-        except (subprocess.CalledProcessError, ValueError):
+            return self._collect_history()["commit_count"]
+        except (OSError, subprocess.CalledProcessError):
             return 0
     
+    def _iter_ls_files(self) -> Iterator[str]:
+        """
+        Stream the paths of all tracked files.
+        
+        Reads NUL-separated `git ls-files -z` output in chunks, so the file list
+        is never held in memory as a whole and paths are never quoted or split
+        on embedded newlines.
+        
+        Yields:
+            Tracked file paths, relative to the repository root
+            
+        Raises:
+            subprocess.CalledProcessError: If the Git command fails
+        """
+        command = ["git", "ls-files", "-z"]
+        with subprocess.Popen(
+            command,
+            cwd=self.repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        ) as process:
+            pending = b""
+            for chunk in iter(lambda: process.stdout.read(1 << 16), b""):
+                *paths, pending = (pending + chunk).split(b"\0")
+                for path in paths:
+                    yield os.fsdecode(path)
+            stderr = process.stderr.read()
+            if process.wait() != 0:
+                raise subprocess.CalledProcessError(
+                    process.returncode,
+                    command,
+                    f"Git command failed: {stderr.decode('utf-8', errors='replace')}"
+                )
+    
     def get_file_count(self) -> int:
         """Get the total number of tracked files."""
         try:
-            output = self._run_git_command(["ls-files"])
-            return len(output.split('\n')) if output else 0
-        except subprocess.CalledProcessError:
+            return sum(1 for _ in self._iter_ls_files())
+        except (OSError, subprocess.CalledProcessError):
             return 0
     
     def get_line_count(self) -> int:
         """Get the total number of lines in all tracked files."""
         try:
-            files_output = self._run_git_command(["ls-files"])
-            if not files_output:
-                return 0
-            
-            total_lines = 0
-            for file_path in files_output.split('\n'):
-                full_path = self.repo_path / file_path
-                if full_path.exists() and full_path.is_file():
-                    try:
-                        with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            total_lines += sum(1 for _ in f)
-                    except (OSError, UnicodeDecodeError):
-                        # Skip files that can't be read
-                        continue
-            
-            return total_lines
-        except subprocess.CalledProcessError:
+            # Reads release the GIL, so overlapping them across threads keeps the disk busy
+            paths = (self.repo_path / file_path for file_path in self._iter_ls_files())
+            total = 0
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                # executor.map submits its whole input up front, so feed it a batch
+                # at a time to keep the number of pending futures bounded
+                while batch := list(islice(paths, self.jobs * 4)):
+                    total += sum(executor.map(_count_lines, batch))
+            return total
+        except (OSError, subprocess.CalledProcessError):
             return 0
     
     def get_contributors(self) -> List[str]:
         """Get a list of unique contributors to the repository."""
         try:
-            output = self._run_git_command(["shortlog", "-sn", "--all"])
-            contributors = []
-            for line in output.split('\n'):
-                if line.strip():
-                    # Format is "count\tname", we want just the name
-                    parts = line.strip().split('\t', 1)
-                    if len(parts) == 2:
-                        contributors.append(parts[1])
-            return contributors
-        except subprocess.CalledProcessError:
+            return self._collect_history()["contributors"]
+        except (OSError, subprocess.CalledProcessError):
             return []
     
     def get_last_commit_date(self) -> str:
         """Get the date of the last commit."""
         try:
-            output = self._run_git_command(["log", "-1", "--format=%ci"])
-            return output
-        except subprocess.CalledProcessError:
+            return self._collect_history()["last_commit_date"]
+        except (OSError, subprocess.CalledProcessError):
             return "Unknown"
     
     def get_repository_size(self) -> str:
         """Get the size of the repository directory."""
         try:
-            total_size = 0
-            for dirpath, dirnames, filenames in os.walk(self.repo_path):
-                for filename in filenames:
-                    filepath = os.path.join(dirpath, filename)
-                    if os.path.exists(filepath):
-                        total_size += os.path.getsize(filepath)
+            # Packs come from count-objects; everything else, loose objects
+            # included, is measured by st_size so the total stays in one unit
+            pack_dir = self.repo_path / ".git" / "objects" / "pack"
+            total_size = self._get_directory_size(self.repo_path, skip=pack_dir)
+            total_size += self._get_pack_size(pack_dir)
             
             # Convert to human-readable format
             for unit in ['B', 'KB', 'MB', 'GB']:
@@ -174,26 +311,135 @@ class GitAnalyzer:
         except OSError:
             return "Unknown"
     
-    def analyze(self) -> GitStats:
+    def _get_directory_size(self, directory: Path, skip: Optional[Path] = None) -> int:
+        """
+        Sum the sizes of all files under a directory.
+        
+        Args:
+            directory: Directory to measure
+            skip: Directory to leave out of the total
+            
+        Returns:
+            Total size in bytes
+        """
+        total_size = 0
+        stack = [str(directory)]
+        skip_path = str(skip) if skip else None
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except OSError:
+                # Removed since its parent was listed, or not readable
+                continue
+            with entries:
+                for entry in entries:
+                    # scandir already knows the entry type, so only files cost a stat call
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.path != skip_path:
+                            stack.append(entry.path)
+                    else:
+                        try:
+                            total_size += entry.stat(follow_symlinks=False).st_size
+                        except OSError:
+                            # Removed since the directory was listed
+                            continue
+        return total_size
+    
+    def _get_pack_size(self, pack_dir: Path) -> int:
+        """Get the size of the repository's packfiles in bytes."""
+        try:
+            # size-pack is the packs' file size in KiB; the loose "size" figure is
+            # disk usage rounded up to whole blocks, so it isn't used here
+            output = self._run_git_command(["count-objects", "-v"])
+            counts = dict(line.split(": ", 1) for line in output.splitlines())
+            return int(counts.get("size-pack", 0)) * 1024
+        except (subprocess.CalledProcessError, ValueError):
+            # Fall back to measuring the pack directory directly
+            return self._get_directory_size(pack_dir)
+    
+    def analyze(self, compute_lines: bool = True, compute_size: bool = True) -> GitStats:
         """
         Perform a complete analysis of the Git repository.
         
+        Args:
+            compute_lines: Count lines in tracked files (reads every file)
+            compute_size: Measure the repository size (stats every file)
+        
         Returns:
             GitStats object containing all repository statistics
         """
         print(f"🔍 Analyzing repository: {self.repo_path}")
         
+        cache_file = self._get_cache_file() if self.use_cache else None
+        if cache_file:
+            stats = self._load_cached_stats(cache_file)
+            # A cached run that skipped the line count doesn't count if we need it now
+            if stats and not (compute_lines and stats.total_lines is None):
+                print("♻️  Using cached analysis (no changes since the last run)")
+                # The size isn't cached: ignored files and gc/repack/fetch change it
+                # without touching any ref or the status output
+                return replace(stats, repository_size=self.get_repository_size() if compute_size else None)
+        
         stats = GitStats(
             total_commits=self.get_commit_count(),
             total_files=self.get_file_count(),
-            total_lines=self.get_line_count(),
+            total_lines=self.get_line_count() if compute_lines else None,
             contributors=self.get_contributors(),
             last_commit_date=self.get_last_commit_date(),
-            repository_size=self.get_repository_size()
+            repository_size=self.get_repository_size() if compute_size else None
         )
         
+        if cache_file:
+            self._save_cached_stats(cache_file, replace(stats, repository_size=None))
+        
         return stats
     
+    def _get_cache_file(self) -> Optional[Path]:
+        """
+        Get the cache file for the repository's current state.
+        
+        Returns:
+            Path to the cache file, or None if the checkout can't be cached
+        """
+        try:
+            # HEAD plus every ref tip - contributors are collected across all refs
+            refs = self._run_git_command(["rev-parse", "HEAD", "--all"])
+            # Uncommitted changes to tracked files change the line count
+            if self._run_git_command(["status", "--porcelain", "--untracked-files=no"]):
+                return None
+        except subprocess.CalledProcessError:
+            # No commits yet, nothing worth caching
+            return None
+        
+        key = hashlib.md5(f"{CACHE_VERSION}\n{self.repo_path}\n{refs}".encode("utf-8")).hexdigest()
+        return CACHE_DIR / f"{key}.json"
+    
+    def _load_cached_stats(self, cache_file: Path) -> Optional[GitStats]:
+        """Load statistics saved by an earlier run, if there are any."""
+        try:
+            with open(cache_file, 'rb') as f:
+                stats = GitStats(**json_compat.loads(f.read()))
+            # Mark as recently used for eviction
+            os.utime(cache_file)
+            return stats
+        except (OSError, ValueError, TypeError):
+            return None
+    
+    def _save_cached_stats(self, cache_file: Path, stats: GitStats) -> None:
+        """Save statistics for later runs, keeping only the most recent entries."""
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file and rename it so readers never see a partial file
+            with tempfile.NamedTemporaryFile('wb', dir=CACHE_DIR, suffix='.tmp', delete=False) as f:
+                f.write(json_compat.dumps(asdict(stats)))
+            os.replace(f.name, cache_file)
+            
+            cached = sorted(CACHE_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+            for old_file in cached[CACHE_SIZE:]:
+                old_file.unlink()
+        except OSError as e:
+            print(f"⚠️  Could not write analysis cache: {e}")
+    
     def print_report(self, stats: GitStats) -> None:
         """Print a formatted report of the repository statistics."""
         print("\n" + "="*50)
@@ -202,8 +448,8 @@ class GitAnalyzer:
         print(f"📁 Repository Path: {self.repo_path}")
         print(f"📈 Total Commits: {stats.total_commits:,}")
         print(f"📄 Total Files: {stats.total_files:,}")
-        print(f"📝 Total Lines: {stats.total_lines:,}")
-        print(f"💾 Repository Size: {stats.repository_size}")
+        print(f"📝 Total Lines: {'skipped' if stats.total_lines is None else f'{stats.total_lines:,}'}")
+        print(f"💾 Repository Size: {stats.repository_size or 'skipped'}")
         print(f"📅 Last Commit: {stats.last_commit_date}")
         print(f"\n👥 Contributors ({len(stats.contributors)}):")
         
@@ -220,18 +466,12 @@ class GitAnalyzer:
         data = {
             "repository_path": str(self.repo_path),
             "analysis_date": datetime.now().isoformat(),
-            "statistics": {
-                "total_commits": stats.total_commits,
-                "total_files": stats.total_files,
-                "total_lines": stats.total_lines,
-                "repository_size": stats.repository_size,
-                "last_commit_date": stats.last_commit_date,
-                "contributors": stats.contributors
-            }
+            "statistics": asdict(stats)
         }
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        # json_compat uses orjson when available and always returns UTF-8 bytes
+        with open(output_file, 'wb') as f:
+            f.write(json_compat.dumps_indented(data))
         
         print(f"📄 Analysis exported to: {output_file}")
 
@@ -250,6 +490,9 @@ Examples:
   python git.py .                           # Analyze current directory
   python git.py /path/to/repo               # Analyze specific repository
   python git.py . --export stats.json      # Export results to JSON
+  python git.py . --jobs 4                  # Read at most 4 files at a time
+  python git.py . --no-cache                # Ignore results cached by earlier runs
+  python git.py . --skip-lines              # Don't read every file to count lines
         """
     )
     
@@ -266,6 +509,31 @@ Examples:
         help="Export analysis results to JSON file"
     )
     
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        metavar="N",
+        help="Number of files to read in parallel when counting lines (default: based on CPU count)"
+    )
+    
+    parser.add_argument(
+        "--skip-lines",
+        action="store_true",
+        help="Skip counting lines of tracked files (the slowest step on large repositories)"
+    )
+    
+    parser.add_argument(
+        "--skip-size",
+        action="store_true",
+        help="Skip measuring the repository size"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Always re-analyze instead of reusing results cached in {CACHE_DIR}"
+    )
+    
     parser.add_argument(
         "--version",
         action="version",
@@ -276,8 +544,8 @@ Examples:
     
     try:
         # Create analyzer and perform analysis
-        analyzer = GitAnalyzer(args.repository)
-        stats = analyzer.analyze()
+        analyzer = GitAnalyzer(args.repository, jobs=args.jobs, use_cache=not args.no_cache)
+        stats = analyzer.analyze(compute_lines=not args.skip_lines, compute_size=not args.skip_size)
         
         # Display results
         analyzer.print_report(stats)
@@ -0,0 +1,45 @@
+"""
+JSON Compatibility Layer
+
+Picks the fastest JSON library available at import time:
+1. orjson (CPython wheels only)
+2. ujson (also builds on PyPy)
+3. the standard library json module
+
+loads() accepts str or bytes; dumps() and dumps_indented() always return
+UTF-8 encoded bytes, so the result can be sent as a request body or written
+to a binary file. dumps() and dumps_indented() take an optional default(obj)
+hook for types the backend can't serialize itself (orjson handles dataclasses and
+datetimes natively, the others need the hook).
+"""
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(obj, default=None):
+        """Serialize obj to UTF-8 encoded JSON bytes."""
+        return orjson.dumps(obj, default=default)
+
+    def dumps_indented(obj, default=None):
+        """Serialize obj to UTF-8 encoded JSON bytes, indented by two spaces."""
+        return orjson.dumps(obj, default=default, option=orjson.OPT_INDENT_2)
+else:
+    try:
+        import ujson as _json
+    except ImportError:
+        import json as _json
+
+    loads = _json.loads
+
+    def dumps(obj, default=None):
+        """Serialize obj to UTF-8 encoded JSON bytes."""
+        return _json.dumps(obj, ensure_ascii=False, default=default).encode('utf-8')
+
+    def dumps_indented(obj, default=None):
+        """Serialize obj to UTF-8 encoded JSON bytes, indented by two spaces."""
+        return _json.dumps(obj, ensure_ascii=False, indent=2, default=default).encode('utf-8')
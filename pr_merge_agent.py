@@ -16,20 +16,40 @@ import requests
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from pathlib import Path
+
+from dotenv import dotenv_values
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Shared session so the fetch, review, status, merge and branch calls all reuse
+# one pooled keep-alive connection to api.github.com. Gateway errors are retried
+# for GET/DELETE only: a 502/504 on the merge PUT may come after GitHub merged,
+# and a replay would get 405 and report a merged PR as failed.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=4,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "DELETE"}),
+        raise_on_status=False
+    )
+))
 
 
 def load_env_file():
     """Load environment variables from .env file if it exists."""
-    env_file = Path(".env")
-    if env_file.exists():
-        with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key.strip()] = value.strip()
+    # A missing file parses as empty; bare keys without '=' come back as None
+    os.environ.update({
+        key: value
+        for key, value in dotenv_values(".env", interpolate=False).items()
+        if value is not None
+    })
 
 
 def get_user_inputs():
@@ -72,7 +92,7 @@ def fetch_pr_details(repo_owner, repo_name, pr_number, github_token):
     print(f"\n📥 Fetching PR #{pr_number} details...")
     
     try:
-        response = requests.get(url, headers=headers)
+        response = SESSION.get(url, headers=headers)
         
         if response.status_code == 200:
             pr_data = response.json()
@@ -93,7 +113,7 @@ def fetch_pr_details(repo_owner, repo_name, pr_number, github_token):
         return None
 
 
-def check_pr_reviews(repo_owner, repo_name, pr_number, github_token):
+def check_pr_reviews(repo_owner, repo_name, pr_number, github_token, log=print):
     """Check the review status of the pull request."""
     url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/pulls/{pr_number}/reviews"
     
@@ -102,16 +122,16 @@ def check_pr_reviews(repo_owner, repo_name, pr_number, github_token):
         "Accept": "application/vnd.github.v3+json",
     }
     
-    print(f"📋 Checking PR reviews...")
+    log(f"📋 Checking PR reviews...")
     
     try:
-        response = requests.get(url, headers=headers)
+        response = SESSION.get(url, headers=headers)
         
         if response.status_code == 200:
             reviews = response.json()
             
             if not reviews:
-                print("⚠️  No reviews found")
+                log("⚠️  No reviews found")
                 return {"has_reviews": False, "approved": False, "blocked": False}
             
             # Analyze reviews
@@ -127,7 +147,7 @@ def check_pr_reviews(repo_owner, repo_name, pr_number, github_token):
             
             for reviewer, review in latest_reviews.items():
                 state = review['state']
-                print(f"   👤 {reviewer}: {state}")
+                log(f"   👤 {reviewer}: {state}")
                 
                 if state == 'APPROVED':
                     approvals += 1
@@ -136,7 +156,7 @@ def check_pr_reviews(repo_owner, repo_name, pr_number, github_token):
                 elif state == 'COMMENTED':
                     comments += 1
             
-            print(f"📊 Review Summary: {approvals} approvals, {rejections} rejections, {comments} comments")
+            log(f"📊 Review Summary: {approvals} approvals, {rejections} rejections, {comments} comments")
             
             return {
                 "has_reviews": True,
@@ -146,51 +166,43 @@ def check_pr_reviews(repo_owner, repo_name, pr_number, github_token):
                 "rejections": rejections
             }
         else:
-            print(f"❌ Failed to fetch reviews: {response.status_code}")
+            log(f"❌ Failed to fetch reviews: {response.status_code}")
             return {"has_reviews": False, "approved": False, "blocked": False}
             
     except Exception as e:
-        print(f"❌ Error fetching reviews: {e}")
+        log(f"❌ Error fetching reviews: {e}")
         return {"has_reviews": False, "approved": False, "blocked": False}
 
 
-def check_status_checks(repo_owner, repo_name, pr_number, github_token):
+def check_status_checks(repo_owner, repo_name, pr_data, github_token, log=print):
     """Check the status checks for the pull request."""
-    # First get the PR to get the head SHA
-    pr_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/pulls/{pr_number}"
+    # The head SHA comes from the PR details fetched earlier - no need to fetch them again
+    head_sha = pr_data['head']['sha']
     
     headers = {
         "Authorization": f"token {github_token}",
         "Accept": "application/vnd.github.v3+json",
     }
     
-    print(f"🔍 Checking status checks...")
+    log(f"🔍 Checking status checks...")
     
     try:
-        pr_response = requests.get(pr_url, headers=headers)
-        if pr_response.status_code != 200:
-            print("❌ Could not fetch PR for status checks")
-            return {"has_checks": False, "all_passed": False}
-        
-        pr_data = pr_response.json()
-        head_sha = pr_data['head']['sha']
-        
         # Get status checks
         status_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/commits/{head_sha}/status"
-        status_response = requests.get(status_url, headers=headers)
+        status_response = SESSION.get(status_url, headers=headers)
         
         if status_response.status_code == 200:
             status_data = status_response.json()
             state = status_data.get('state', 'unknown')
             statuses = status_data.get('statuses', [])
             
-            print(f"📊 Overall status: {state}")
+            log(f"📊 Overall status: {state}")
             
             if statuses:
                 for status in statuses:
-                    print(f"   ✓ {status['context']}: {status['state']}")
+                    log(f"   ✓ {status['context']}: {status['state']}")
             else:
-                print("   No status checks found")
+                log("   No status checks found")
             
             return {
                 "has_checks": len(statuses) > 0,
@@ -198,14 +210,36 @@ def check_status_checks(repo_owner, repo_name, pr_number, github_token):
                 "state": state
             }
         else:
-            print("⚠️  No status checks found")
+            log("⚠️  No status checks found")
             return {"has_checks": False, "all_passed": True}  # No checks = OK to merge
             
     except Exception as e:
-        print(f"❌ Error checking status: {e}")
+        log(f"❌ Error checking status: {e}")
         return {"has_checks": False, "all_passed": False}
 
 
+def run_merge_checks(repo_owner, repo_name, pr_number, pr_data, github_token):
+    """Check reviews and status checks concurrently, printing their output in order."""
+    review_log = []
+    status_log = []
+    
+    # The two checks are independent API calls, so overlap their round-trips
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        review_future = executor.submit(
+            check_pr_reviews, repo_owner, repo_name, pr_number, github_token, log=review_log.append
+        )
+        status_future = executor.submit(
+            check_status_checks, repo_owner, repo_name, pr_data, github_token, log=status_log.append
+        )
+        review_status = review_future.result()
+        status_checks = status_future.result()
+    
+    for line in review_log + status_log:
+        print(line)
+    
+    return review_status, status_checks
+
+
 def merge_pull_request(repo_owner, repo_name, pr_number, pr_data, github_token):
     """Merge the pull request via GitHub API."""
     url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/pulls/{pr_number}/merge"
@@ -226,7 +260,7 @@ def merge_pull_request(repo_owner, repo_name, pr_number, pr_data, github_token):
     print(f"📝 Commit title: {merge_data['commit_title']}")
     
     try:
-        response = requests.put(url, headers=headers, json=merge_data)
+        response = SESSION.put(url, headers=headers, json=merge_data)
         
         if response.status_code == 200:
             merge_result = response.json()
@@ -256,7 +290,7 @@ def delete_branch(repo_owner, repo_name, branch_name, github_token):
     print(f"\n🗑️  Deleting branch: {branch_name}...")
     
     try:
-        response = requests.delete(url, headers=headers)
+        response = SESSION.delete(url, headers=headers)
         
         if response.status_code == 204:
             print(f"✅ Branch {branch_name} deleted successfully!")
@@ -309,11 +343,8 @@ def main():
         print("   Resolve conflicts manually before merging.")
         return 1
     
-    # Check reviews
-    review_status = check_pr_reviews(repo_owner, repo_name, pr_number, github_token)
-    
-    # Check status checks
-    status_checks = check_status_checks(repo_owner, repo_name, pr_number, github_token)
+    # Check reviews and status checks
+    review_status, status_checks = run_merge_checks(repo_owner, repo_name, pr_number, pr_data, github_token)
     
     # Evaluate merge safety
     print(f"\n📋 Merge Safety Assessment:")
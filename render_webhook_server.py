@@ -4,6 +4,7 @@ Production Webhook Server for Render.com Deployment
 """
 
 import os
+import atexit
 import json
 import hashlib
 import hmac
@@ -11,7 +12,15 @@ import logging
 import requests
 import re
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
+from dotenv import dotenv_values
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import threading
+import time
+
+import json_compat
 
 # Set up logging for production
 logging.basicConfig(level=logging.INFO)
@@ -19,121 +28,225 @@ logger = logging.getLogger(__name__)
 
 def load_env_vars():
     """Load environment variables from .env file if it exists"""
-    env_file = '.env'
-    env_vars = {}
-    
-    if os.path.exists(env_file):
-        with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    env_vars[key.strip()] = value.strip().strip('"\'')
-    
-    for key, value in env_vars.items():
-        os.environ[key] = value
+    # A missing file parses as empty; bare keys without '=' come back as None
+    env_vars = {
+        key: value
+        for key, value in dotenv_values('.env', interpolate=False).items()
+        if value is not None
+    }
+    os.environ.update(env_vars)
     
     return env_vars
 
 # Load environment variables
 load_env_vars()
 
+class FastJSONProvider(DefaultJSONProvider):
+    """Serve jsonify() and request.get_json() through json_compat (orjson when installed)"""
+    
+    def dumps(self, obj, **kwargs):
+        # Keep Flask's fallback for Decimal, UUID, dates and dataclasses
+        return json_compat.dumps(obj, default=kwargs.get('default', self.default)).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return json_compat.loads(s)
+
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 
 # Configuration - CRITICAL: Render.com requires PORT env var
 PORT = int(os.getenv('PORT', 10000))
-WEBHOOK_SECRET = os.getenv('GITHUB_WEBHOOK_SECRET', 'your-webhook-secret-here')
+# Signatures are only enforced when a secret is configured (GitHub sends none otherwise)
+WEBHOOK_SECRET = os.getenv('GITHUB_WEBHOOK_SECRET', '').encode('utf-8')
 GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
+# Static endpoint bodies never change after startup, so serialize them once
+HEALTH_RESPONSE = json_compat.dumps({
+    'status': 'healthy',
+    'webhook_server': 'running',
+    'github_token': 'configured' if GITHUB_TOKEN else 'missing',
+    'openai_key': 'configured' if OPENAI_API_KEY else 'missing',
+    'environment': 'production',
+    'port': PORT
+})
+
+INDEX_RESPONSE = json_compat.dumps({
+    'name': 'AI Copilot Webhook Server',
+    'version': '1.0.0',
+    'environment': 'production',
+    'status': 'ready',
+    'port': PORT
+})
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Simple health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'webhook_server': 'running',
-        'github_token': 'configured' if GITHUB_TOKEN else 'missing',
-        'openai_key': 'configured' if OPENAI_API_KEY else 'missing',
-        'environment': 'production',
-        'port': PORT
-    }), 200
+    return app.response_class(HEALTH_RESPONSE, status=200, mimetype='application/json')
 
 @app.route('/', methods=['GET'])
 def index():
     """Root endpoint with basic info"""
-    return jsonify({
-        'name': 'AI Copilot Webhook Server',
-        'version': '1.0.0',
-        'environment': 'production',
-        'status': 'ready',
-        'port': PORT
-    }), 200
+    return app.response_class(INDEX_RESPONSE, status=200, mimetype='application/json')
+
+# Shared session so reviews reuse pooled keep-alive connections to
+# api.github.com and api.openai.com instead of a TLS handshake per call.
+# Only connect failures and statuses where the API did not act on the request
+# are retried. Read errors are not (read=False): a POST whose response is slow
+# or lost may already have posted a comment or been billed by OpenAI.
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=2,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=3,
+        read=False,
+        backoff_factor=0.3,
+        status_forcelist=(429, 503),
+        allowed_methods=None,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+))
+# (connect, read) timeouts so a hung GitHub connection can't pin a review thread forever
+GITHUB_TIMEOUT = (5, 15)
+
+# Short-lived cache for GitHub GETs: url -> (expires_at, etag, body).
+# Expired entries are revalidated with If-None-Match, so an unchanged
+# resource costs a 304 instead of a full response against the rate limit.
+GITHUB_CACHE_TTL = 60
+GITHUB_CACHE_MAXSIZE = 512
+_github_cache = {}
+_github_cache_lock = threading.Lock()
+
+def github_get_json(url, headers):
+    """GET a GitHub API URL, reusing a recent or ETag-revalidated response"""
+    now = time.monotonic()
+    with _github_cache_lock:
+        cached = _github_cache.get(url)
+    
+    if cached and cached[0] > now:
+        return 200, cached[2]
+    if cached and cached[1]:
+        headers = {**headers, 'If-None-Match': cached[1]}
+    
+    response = SESSION.get(url, headers=headers, timeout=GITHUB_TIMEOUT)
+    if response.status_code == 304 and cached:
+        body = cached[2]
+    elif response.status_code == 200:
+        body = json_compat.loads(response.content)
+    else:
+        return response.status_code, None
+    
+    with _github_cache_lock:
+        _github_cache.pop(url, None)
+        if len(_github_cache) >= GITHUB_CACHE_MAXSIZE:
+            # Dicts keep insertion order, so the first key is the oldest entry
+            _github_cache.pop(next(iter(_github_cache)))
+        _github_cache[url] = (now + GITHUB_CACHE_TTL, response.headers.get('ETag'), body)
+    
+    return 200, body
 
 def get_pr_files(pr_number, github_token, repo_name):
     """Get changed files from a PR"""
     try:
-        url = f"https://api.github.com/repos/{repo_name}/pulls/{pr_number}/files"
+        url = f"https://api.github.com/repos/{repo_name}/pulls/{pr_number}/files?per_page=100"
         headers = {
             'Authorization': f'token {github_token}',
             'Accept': 'application/vnd.github.v3+json'
         }
         
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            return response.json()
+        status_code, files = github_get_json(url, headers)
+        if status_code == 200:
+            return files
         else:
-            logger.error(f"Failed to get PR files: {response.status_code}")
+            logger.error(f"Failed to get PR files: {status_code}")
             return []
     except Exception as e:
         logger.error(f"Error getting PR files: {e}")
         return []
 
+# New-file start line in a hunk header: "@@ -a,b +c,d @@"
+HUNK_START_RE = re.compile(r'\+(\d+)')
+# Files whose changes are not sent for AI review
+SKIP_REVIEW_EXTENSIONS = ('.md', '.txt', '.json', '.yml', '.yaml')
+# Mega-diffs (big refactors, generated or vendored files) are skipped: the
+# model would truncate them anyway and parsing them wastes CPU and memory
+MAX_FILE_CHANGES = 500
+MAX_PATCH_BYTES = 50_000
+
 def analyze_code_change(patch, file_path):
     """Analyze code changes from git patch"""
     changes = []
     if not patch:
         return changes
     
-    lines = patch.split('\n')
     line_number = 0
+    # Bound once - this loop runs for every line of every patch
+    append = changes.append
+    search = HUNK_START_RE.search
     
-    for line in lines:
-        if line.startswith('@@'):
+    for line in patch.split('\n'):
+        first = line[:1]
+        if first == '-':
+            # Removed lines don't exist in the new file
+            continue
+        if first == '@' and line[:2] == '@@':
             # Parse line number from hunk header
-            match = re.search(r'\+(\d+)', line)
+            match = search(line)
             if match:
                 line_number = int(match.group(1))
-        elif line.startswith('+') and not line.startswith('+++'):
+            continue
+        if first == '+' and line[:3] != '+++':
             # This is an added line
             code = line[1:]  # Remove the '+' prefix
             if code.strip():  # Only non-empty lines
-                changes.append({
+                append({
                     'type': 'addition',
                     'line': line_number,
                     'code': code
                 })
-            line_number += 1
-        elif not line.startswith('-'):
-            line_number += 1
+        line_number += 1
     
     return changes
 
-def generate_ai_review(code, file_path, change_type, openai_key):
-    """Generate AI review comment using OpenAI"""
+# Successful reviews keyed by sha256 of the file path and its changes, so
+# webhook retries and reopened PRs don't pay OpenAI again for the same code
+REVIEW_CACHE_MAXSIZE = 1024
+_review_cache = {}
+_review_cache_lock = threading.Lock()
+
+def generate_ai_review(changes, file_path, openai_key):
+    """Generate AI review comments for several changes in one file with a single OpenAI call.
+    
+    Returns a dict of line number -> comment; empty if the review failed.
+    """
     try:
-        # Simple AI review prompt
-        prompt = f"""Review this code change:
+        # One prompt per file: each change is marked with its line so the
+        # answer can be mapped back to the right place in the diff
+        change_blocks = '\n\n'.join(
+            f"### Change @ line {change['line']}\n{change['code']}" for change in changes
+        )
+        cache_key = hashlib.sha256(f"{file_path}\n{change_blocks}".encode('utf-8')).digest()
+        with _review_cache_lock:
+            cached = _review_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        prompt = f"""Review these code changes:
 
 File: {file_path}
-Code: {code}
 
-Provide a brief code review focusing on:
+{change_blocks}
+
+For each change, provide a brief code review focusing on:
 - Potential bugs or errors
 - Security issues
 - Performance improvements
 - Best practices
 
-Keep response under 100 words."""
+Keep each review under 100 words. Respond with JSON only, in the form
+{{"reviews": [{{"line": <line number>, "comment": "<review>"}}]}}"""
 
         # OpenAI API call (simplified)
         headers = {
@@ -144,23 +257,42 @@ Keep response under 100 words."""
         data = {
             'model': 'gpt-3.5-turbo',
             'messages': [{'role': 'user', 'content': prompt}],
-            'max_tokens': 150,
+            'response_format': {'type': 'json_object'},
+            'max_tokens': 150 * len(changes),
             'temperature': 0.7
         }
         
-        response = requests.post('https://api.openai.com/v1/chat/completions', 
-                               headers=headers, json=data, timeout=30)
+        response = SESSION.post('https://api.openai.com/v1/chat/completions', 
+                              headers=headers, json=data, timeout=(5, 30))
         
         if response.status_code == 200:
-            result = response.json()
-            return result['choices'][0]['message']['content'].strip()
+            result = json_compat.loads(response.content)
+            content = result['choices'][0]['message']['content']
+            reviews = json_compat.loads(content).get('reviews', [])
+            comments = {
+                review['line']: review['comment'].strip()
+                for review in reviews
+                if isinstance(review, dict) and isinstance(review.get('line'), int)
+                and isinstance(review.get('comment'), str) and review['comment'].strip()
+            }
+            
+            with _review_cache_lock:
+                if len(_review_cache) >= REVIEW_CACHE_MAXSIZE:
+                    # Dicts keep insertion order, so the first key is the oldest entry
+                    _review_cache.pop(next(iter(_review_cache)))
+                _review_cache[cache_key] = comments
+            return comments
         else:
-            logger.error(f"OpenAI API error: {response.status_code}")
-            return "Error: AI review unavailable"
+            logger.error("OpenAI API error: %s", response.status_code)
+            return {}
             
     except Exception as e:
-        logger.error(f"Error generating AI review: {e}")
-        return f"Error: {str(e)}"
+        logger.error("Error generating AI review: %s", e)
+        return {}
+
+# GitHub wants content-creating requests from one token made serially; concurrent
+# POSTs trip the secondary rate limit (403), so comments go out one at a time
+_comment_post_lock = threading.Lock()
 
 def post_review_comment(pr_number, sha, file_path, line, comment, github_token, repo_name):
     """Post a review comment on GitHub PR"""
@@ -178,89 +310,171 @@ def post_review_comment(pr_number, sha, file_path, line, comment, github_token,
             'position': line  # Use 'position' instead of 'line' for diff line numbers
         }
         
-        response = requests.post(url, headers=headers, json=data)
+        with _comment_post_lock:
+            response = SESSION.post(url, headers=headers, json=data, timeout=GITHUB_TIMEOUT)
         if response.status_code == 201:
-            logger.info(f"✅ Posted comment successfully")
+            logger.info("✅ Posted comment successfully")
             return True
         else:
-            logger.error(f"Failed to post comment: {response.status_code} - {response.text}")
+            logger.error("Failed to post comment: %s - %s", response.status_code, response.text)
             return False
             
     except Exception as e:
-        logger.error(f"Error posting comment: {e}")
+        logger.error("Error posting comment: %s", e)
         return False
 
+def review_file(file_data, openai_key):
+    """Generate AI review comments for the added lines of one changed file"""
+    file_path = file_data['filename']
+    patch = file_data.get('patch', '')
+    
+    # Review up to 3 changes per file
+    changes = [change for change in analyze_code_change(patch, file_path)[:3] if change['type'] == 'addition']
+    if not changes:
+        return []
+    
+    logger.info("🧠 Generating AI review for %s (%s changes)...", file_path, len(changes))
+    ai_comments = generate_ai_review(changes, file_path, openai_key)
+    return [(change['line'], ai_comments[change['line']]) for change in changes if change['line'] in ai_comments]
+
 def run_ai_review(pr_number, repo_name):
     """Run AI code review in background thread"""
     try:
-        logger.info(f"🤖 Starting AI review for PR #{pr_number} in {repo_name}")
+        logger.info("🤖 Starting AI review for PR #%s in %s", pr_number, repo_name)
         
-        github_token = os.getenv('GITHUB_TOKEN')
-        openai_key = os.getenv('OPENAI_API_KEY')
+        # Read once at startup (after .env is loaded) - they don't change while running
+        github_token = GITHUB_TOKEN
+        openai_key = OPENAI_API_KEY
         
         if not github_token or not openai_key:
             logger.error("❌ Missing API keys for AI review")
             return
         
-        logger.info(f"🔍 Fetching PR #{pr_number} files...")
+        logger.info("🔍 Fetching PR #%s files...", pr_number)
         files = get_pr_files(pr_number, github_token, repo_name)
         
         if not files:
             logger.warning("❌ No files found in PR")
             return
         
-        logger.info(f"📁 Found {len(files)} changed files")
-        review_count = 0
+        logger.info("📁 Found %s changed files", len(files))
         
+        reviewable = []
         for file_data in files:
             file_path = file_data['filename']
-            patch = file_data.get('patch', '')
-            sha = file_data['sha']
-            
-            logger.info(f"📄 Reviewing: {file_path}")
+            logger.info("📄 Reviewing: %s", file_path)
             
             # Skip certain file types
-            if any(file_path.endswith(ext) for ext in ['.md', '.txt', '.json', '.yml', '.yaml']):
+            if file_path.endswith(SKIP_REVIEW_EXTENSIONS):
                 continue
             
-            changes = analyze_code_change(patch, file_path)
-            
-            if not changes:
+            # Skip binary files (no patch) and oversized diffs
+            patch = file_data.get('patch')
+            if not patch or len(patch) > MAX_PATCH_BYTES or file_data.get('changes', 0) > MAX_FILE_CHANGES:
+                logger.info("⏭️ Skipping %s: no patch or diff too large", file_path)
                 continue
             
-            # Review up to 3 changes per file
-            for change in changes[:3]:
-                if change['type'] == 'addition':
-                    logger.info(f"🧠 Generating AI review for line {change['line']}...")
-                    
-                    ai_comment = generate_ai_review(
-                        change['code'], 
-                        file_path, 
-                        change['type'], 
-                        openai_key
-                    )
-                    
-                    if not ai_comment.startswith("Error:"):
-                        success = post_review_comment(
-                            pr_number, 
-                            sha, 
-                            file_path, 
-                            change['line'], 
-                            f"🤖 **Auto AI Review:**\n\n{ai_comment}", 
-                            github_token, 
-                            repo_name
-                        )
-                        
-                        if success:
-                            logger.info(f"✅ Posted AI review comment on line {change['line']}")
-                            review_count += 1
-                        else:
-                            logger.error(f"❌ Failed to post comment on line {change['line']}")
+            reviewable.append(file_data)
+        
+        # Files are independent and each one mostly waits on OpenAI, so review them side by side
+        with ThreadPoolExecutor(max_workers=FILE_REVIEW_WORKERS) as executor:
+            reviews = list(executor.map(review_file, reviewable, [openai_key] * len(reviewable)))
+        
+        # Post the comments one by one (see _comment_post_lock)
+        review_count = 0
+        for file_data, file_comments in zip(reviewable, reviews):
+            file_path = file_data['filename']
+            for line, ai_comment in file_comments:
+                success = post_review_comment(
+                    pr_number, 
+                    file_data['sha'], 
+                    file_path, 
+                    line, 
+                    f"🤖 **Auto AI Review:**\n\n{ai_comment}", 
+                    github_token, 
+                    repo_name
+                )
+                
+                if success:
+                    logger.info("✅ Posted AI review comment on %s line %s", file_path, line)
+                    review_count += 1
+                else:
+                    logger.error("❌ Failed to post comment on %s line %s", file_path, line)
         
-        logger.info(f"🎉 AI Review Complete! Posted {review_count} comments on PR #{pr_number}")
+        logger.info("🎉 AI Review Complete! Posted %s comments on PR #%s", review_count, pr_number)
         
     except Exception as e:
-        logger.error(f"❌ Error in AI review: {e}")
+        logger.error("❌ Error in AI review: %s", e)
+    finally:
+        with _inflight_lock:
+            _inflight_reviews.discard((repo_name, pr_number))
+
+# Reviews run on a bounded pool of background threads so webhook deliveries
+# are acknowledged immediately instead of waiting on GitHub/OpenAI. Bursts
+# beyond REVIEW_WORKERS wait in the pool's queue rather than spawning threads.
+REVIEW_WORKERS = int(os.getenv('REVIEW_WORKERS', 4))
+review_pool = ThreadPoolExecutor(max_workers=REVIEW_WORKERS, thread_name_prefix='ai-review')
+atexit.register(review_pool.shutdown, wait=False)
+# Files sent to OpenAI concurrently within one PR (REVIEW_WORKERS x this stays within the session pool)
+FILE_REVIEW_WORKERS = 8
+# (repo, PR) pairs with a review queued or running, so redelivered events don't review twice
+_inflight_reviews = set()
+_inflight_lock = threading.Lock()
+
+def verify_signature(body, signature_header):
+    """Check the X-Hub-Signature-256 header against the raw request body"""
+    if not WEBHOOK_SECRET:
+        return True
+    if not signature_header:
+        return False
+    expected = 'sha256=' + hmac.new(WEBHOOK_SECRET, body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature_header)
+
+def handle_pull_request_event(payload):
+    """Handle a pull_request webhook event"""
+    action = payload.get('action')
+    logger.info(f"🔄 PR Action: {action}")
+    
+    # Only a newly opened PR triggers a review; skip the PR details otherwise
+    if action != 'opened':
+        return jsonify({
+            'status': 'ignored',
+            'message': f'Action "{action}" not handled'
+        }), 200
+    
+    pr_data = payload.get('pull_request', {})
+    repo_data = payload.get('repository', {})
+    
+    pr_number = pr_data.get('number')
+    repo_name = repo_data.get('full_name')
+    pr_title = pr_data.get('title', 'Unknown')
+    
+    logger.info(f"📋 PR #{pr_number}: {pr_title}")
+    logger.info(f"📁 Repository: {repo_name}")
+    key = (repo_name, pr_number)
+    with _inflight_lock:
+        if key in _inflight_reviews:
+            logger.info("⏭️ Review already in progress for PR #%s in %s", pr_number, repo_name)
+            return jsonify({
+                'status': 'ignored',
+                'message': f'AI review already in progress for PR #{pr_number}'
+            }), 200
+        _inflight_reviews.add(key)
+    
+    logger.info(f"🚀 New PR detected! Triggering AI review...")
+    
+    # Hand off to the review pool and acknowledge right away
+    review_pool.submit(run_ai_review, pr_number, repo_name)
+    
+    return jsonify({
+        'status': 'queued',
+        'message': f'AI review queued for PR #{pr_number}'
+    }), 202
+
+# Webhook event type -> handler; events without an entry get an empty 204
+EVENT_HANDLERS = {
+    'pull_request': handle_pull_request_event,
+}
 
 @app.route('/webhook', methods=['POST'])
 def github_webhook():
@@ -270,50 +484,26 @@ def github_webhook():
     event_type = request.headers.get('X-GitHub-Event')
     logger.info(f"📨 Event Type: {event_type}")
     
+    # Pushes, statuses, checks etc. are acknowledged without reading the body
+    handler = EVENT_HANDLERS.get(event_type)
+    if handler is None:
+        return '', 204
+    
+    # Reject forged deliveries before spending any time on the JSON body
+    body = request.get_data()
+    if not verify_signature(body, request.headers.get('X-Hub-Signature-256')):
+        logger.warning("❌ Invalid webhook signature")
+        return jsonify({'error': 'Invalid signature'}), 401
+    
     try:
-        payload = request.get_json()
+        # Parse the raw body directly; json_compat uses orjson when it is installed
+        payload = json_compat.loads(body)
         logger.info(f"📦 Payload received")
     except Exception as e:
         logger.error(f"❌ Error parsing JSON: {e}")
         return jsonify({'error': 'Invalid JSON'}), 400
     
-    if event_type == 'pull_request':
-        action = payload.get('action')
-        pr_data = payload.get('pull_request', {})
-        repo_data = payload.get('repository', {})
-        
-        pr_number = pr_data.get('number')
-        repo_name = repo_data.get('full_name')
-        pr_title = pr_data.get('title', 'Unknown')
-        
-        logger.info(f"🔄 PR Action: {action}")
-        logger.info(f"📋 PR #{pr_number}: {pr_title}")
-        logger.info(f"📁 Repository: {repo_name}")
-        
-        # Trigger AI review when PR is opened
-        if action == 'opened':
-            logger.info(f"🚀 New PR detected! Triggering AI review...")
-            
-            # Run AI review in background thread
-            thread = threading.Thread(
-                target=run_ai_review, 
-                args=(pr_number, repo_name)
-            )
-            thread.daemon = True
-            thread.start()
-            
-            return jsonify({
-                'status': 'success',
-                'message': f'AI review triggered for PR #{pr_number}'
-            }), 200
-        
-        else:
-            return jsonify({
-                'status': 'ignored',
-                'message': f'Action "{action}" not handled'
-            }), 200
-    
-    return jsonify({'status': 'ignored'}), 200
+    return handler(payload)
 
 if __name__ == '__main__':
     logger.info("🚀 Starting AI Copilot Webhook Server...")
@@ -321,4 +511,11 @@ if __name__ == '__main__':
     logger.info(f"🔑 GitHub Token: {'✅' if GITHUB_TOKEN else '❌'}")
     
     # CRITICAL: Render.com requires host='0.0.0.0' and the PORT env var
-    app.run(host='0.0.0.0', port=PORT, debug=False)
\ No newline at end of file
+    try:
+        from waitress import serve
+    except ImportError:
+        logger.warning("⚠️ waitress not installed - falling back to the Flask development server")
+        app.run(host='0.0.0.0', port=PORT, debug=False, threaded=True)
+    else:
+        # Production WSGI server with a worker thread pool and keep-alive support
+        serve(app, host='0.0.0.0', port=PORT, threads=8)
\ No newline at end of file
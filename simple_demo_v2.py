@@ -62,8 +62,9 @@ def create_real_files_and_commit(repo_owner, repo_name, github_token, issue_numb
     """Clone repo, create real files, and commit them."""
     
     repo_url = f"https://{github_token}@github.com/{repo_owner}/{repo_name}.git"
-    temp_dir = Path(tempfile.mkdtemp())
-    repo_path = temp_dir / repo_name
+    # Removed in the finally block so repeated runs don't leak clones into the temp dir
+    temp_dir = tempfile.TemporaryDirectory(ignore_cleanup_errors=True)
+    repo_path = Path(temp_dir.name) / repo_name
     
     print(f"\n🔄 Step 2: Creating real files and commits...")
     
@@ -78,13 +79,9 @@ def create_real_files_and_commit(repo_owner, repo_name, github_token, issue_numb
         )
         print("✅ Repository cloned successfully!")
         
-        # Change to repo directory
-        original_cwd = os.getcwd()
-        os.chdir(repo_path)
-        
         # Create branch
         branch_name = f"copilot-demo-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
-        subprocess.run(["git", "checkout", "-b", branch_name], check=True, capture_output=True)
+        subprocess.run(["git", "checkout", "-b", branch_name], check=True, capture_output=True, cwd=repo_path)
         print(f"✅ Created branch: {branch_name}")
         
         # Create README.md file
@@ -115,7 +112,7 @@ This repository demonstrates **REAL** GitHub Copilot agent actions (no simulatio
 *This file was automatically generated by a real Copilot agent demo.*
 """
         
-        with open("README.md", "w", encoding="utf-8") as f:
+        with open(repo_path / "README.md", "w", encoding="utf-8") as f:
             f.write(readme_content)
         print("✅ Created README.md")
         
@@ -140,21 +137,21 @@ if __name__ == "__main__":
     main()
 '''
         
-        with open("example.py", "w", encoding="utf-8") as f:
+        with open(repo_path / "example.py", "w", encoding="utf-8") as f:
             f.write(example_content)
         print("✅ Created example.py")
         
         # Add files to git
-        subprocess.run(["git", "add", "."], check=True, capture_output=True)
+        subprocess.run(["git", "add", "."], check=True, capture_output=True, cwd=repo_path)
         print("✅ Added files to git")
         
         # Commit files
         commit_message = f"🤖 Add files for issue #{issue_number} - Copilot agent demo"
-        subprocess.run(["git", "commit", "-m", commit_message], check=True, capture_output=True)
+        subprocess.run(["git", "commit", "-m", commit_message], check=True, capture_output=True, cwd=repo_path)
         print("✅ Created git commit")
         
         # Push to GitHub
-        subprocess.run(["git", "push", "-u", "origin", branch_name], check=True, capture_output=True)
+        subprocess.run(["git", "push", "-u", "origin", branch_name], check=True, capture_output=True, cwd=repo_path)
         print("✅ Pushed branch to GitHub")
         
         print(f"\n🎉 Files created and committed successfully!")
@@ -171,7 +168,7 @@ if __name__ == "__main__":
         print(f"❌ Error creating files: {e}")
         return None
     finally:
-        os.chdir(original_cwd)
+        temp_dir.cleanup()
 
 
 def main():
@@ -75,8 +75,9 @@ def create_real_files_and_commit(repo_owner, repo_name, github_token, issue_numb
     """Clone repo, create real files, and commit them."""
     
     repo_url = f"https://{github_token}@github.com/{repo_owner}/{repo_name}.git"
-    temp_dir = Path(tempfile.mkdtemp())
-    repo_path = temp_dir / repo_name
+    # Removed in the finally block so repeated runs don't leak clones into the temp dir
+    temp_dir = tempfile.TemporaryDirectory(ignore_cleanup_errors=True)
+    repo_path = Path(temp_dir.name) / repo_name
     
     print(f"\n🔄 Step 2: Creating real files and commits...")
     
@@ -91,13 +92,9 @@ def create_real_files_and_commit(repo_owner, repo_name, github_token, issue_numb
         )
         print("✅ Repository cloned successfully!")
         
-        # Change to repo directory
-        original_cwd = os.getcwd()
-        os.chdir(repo_path)
-        
         # Create branch
         branch_name = f"copilot-demo-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
-        subprocess.run(["git", "checkout", "-b", branch_name], check=True, capture_output=True)
+        subprocess.run(["git", "checkout", "-b", branch_name], check=True, capture_output=True, cwd=repo_path)
         print(f"✅ Created branch: {branch_name}")
         
         # Create README.md file
@@ -135,7 +132,7 @@ This repository demonstrates **REAL** GitHub Copilot agent actions (no simulatio
 *This file was automatically generated by a real Copilot agent demo.*
 """
         
-        with open("README.md", "w", encoding="utf-8") as f:
+        with open(repo_path / "README.md", "w", encoding="utf-8") as f:
             f.write(readme_content)
         print("✅ Created README.md")
         
@@ -171,7 +168,7 @@ if __name__ == "__main__":
     main()
 '''
         
-        with open("example.py", "w", encoding="utf-8") as f:
+        with open(repo_path / "example.py", "w", encoding="utf-8") as f:
             f.write(example_content)
         print("✅ Created example.py")
         
@@ -191,21 +188,21 @@ if __name__ == "__main__":
             "timestamp": datetime.now().isoformat()
         }
         
-        with open("demo_config.json", "w", encoding="utf-8") as f:
+        with open(repo_path / "demo_config.json", "w", encoding="utf-8") as f:
             json.dump(config_data, f, indent=2)
         print("✅ Created demo_config.json")
         
         # Add files to git
-        subprocess.run(["git", "add", "."], check=True, capture_output=True)
+        subprocess.run(["git", "add", "."], check=True, capture_output=True, cwd=repo_path)
         print("✅ Added files to git")
         
         # Commit files
         commit_message = f"🤖 Add files for issue #{issue_number} - Copilot agent demo v3"
-        subprocess.run(["git", "commit", "-m", commit_message], check=True, capture_output=True)
+        subprocess.run(["git", "commit", "-m", commit_message], check=True, capture_output=True, cwd=repo_path)
         print("✅ Created git commit")
         
         # Push to GitHub
-        subprocess.run(["git", "push", "-u", "origin", branch_name], check=True, capture_output=True)
+        subprocess.run(["git", "push", "-u", "origin", branch_name], check=True, capture_output=True, cwd=repo_path)
         print("✅ Pushed branch to GitHub")
         
         print(f"\n🎉 Files created and committed successfully!")
@@ -222,7 +219,7 @@ if __name__ == "__main__":
         print(f"❌ Error creating files: {e}")
         return None
     finally:
-        os.chdir(original_cwd)
+        temp_dir.cleanup()
 
 
 def create_pull_request(repo_owner, repo_name, github_token, branch_name, issue_number):